@@ -0,0 +1,105 @@
+"""Throughput of a shared `GraphConnection` against a driver per request, on the fake driver.
+
+Worker threads issue chatbot-style reads through one shared `GraphConnection`, as the
+Flask app does, and then replay the old pattern of a driver per request, where no
+connection is ever reused. The fake pool simulates the cost of opening a connection;
+what `GraphConnection` passes to the driver is covered by tests/test_graph_connection.py.
+
+Usage (from vet_kg/):
+    python -m benchmarks.bench_connection_pool --threads 16 --requests 200 --pool-size 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import SRC_DIR  # noqa: F401  (puts src/ on sys.path)
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+import graph_connection
+
+DRUG = 'ACARBOSE'
+
+
+def read_storage(tx, drug_name: str):
+    return tx.run("""
+        MATCH (d:Drug {name: $drug_name})
+        RETURN d.storage as storage
+        """, drug_name=drug_name).single()
+
+
+def run_shared(graph: FakeGraph, neo4j_config: dict, threads: int, requests: int) -> dict:
+    """Every thread reads through one long-lived connection layer."""
+    with patch_graph_database(graph, graph_connection) as fake:
+        connection = graph_connection.GraphConnection(neo4j_config)
+
+        def worker(_):
+            return [connection.read(read_storage, DRUG)['storage'] for _ in range(requests)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            answers = [answer for batch in executor.map(worker, range(threads)) for answer in batch]
+        seconds = time.perf_counter() - start
+        # A second close, as from atexit after an explicit close, must be harmless
+        connection.close()
+        connection.close()
+
+    pool = fake.drivers[0].pool
+    return {'answers': answers, 'seconds': seconds, 'drivers': len(fake.drivers),
+            'connections': pool.created, 'acquisitions': pool.acquisitions, 'peak_in_use': pool.peak_in_use}
+
+
+def run_per_request(graph: FakeGraph, neo4j_config: dict, threads: int, requests: int) -> dict:
+    """Each request builds and closes its own driver, as the old teardown hook forced."""
+    with patch_graph_database(graph, graph_connection) as fake:
+        def worker(_):
+            answers = []
+            for _ in range(requests):
+                connection = graph_connection.GraphConnection(neo4j_config)
+                answers.append(connection.read(read_storage, DRUG)['storage'])
+                connection.close()
+            return answers
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            answers = [answer for batch in executor.map(worker, range(threads)) for answer in batch]
+        seconds = time.perf_counter() - start
+
+    return {'answers': answers, 'seconds': seconds, 'drivers': len(fake.drivers),
+            'connections': sum(driver.pool.created for driver in fake.drivers),
+            'acquisitions': sum(driver.pool.acquisitions for driver in fake.drivers),
+            'peak_in_use': max(driver.pool.peak_in_use for driver in fake.drivers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help='reads per thread')
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=0.5, help='simulated round-trip per statement')
+    parser.add_argument('--connect-ms', type=float, default=5.0, help='simulated cost of opening a connection')
+    args = parser.parse_args()
+
+    graph = FakeGraph(latency=args.latency_ms / 1000, connect_latency=args.connect_ms / 1000)
+    graph.run("CREATE (d:Drug {name: $name, storage: $storage})",
+              name=DRUG, storage='Do not store tablets above 25°C (77°F); protect from moisture.')
+    neo4j_config = {
+        'uri': 'bolt://fake:7687', 'user': 'neo4j', 'password': 'benchmark',
+        'pool': {'max_connection_pool_size': args.pool_size, 'connection_acquisition_timeout': 5.0},
+    }
+
+    total = args.threads * args.requests
+    print(f"{'mode':<12} {'reads/s':>10} {'drivers':>8} {'connections':>12} {'peak in use':>12}")
+    for mode, runner in (('shared', run_shared), ('per-request', run_per_request)):
+        result = runner(graph, neo4j_config, args.threads, args.requests)
+        print(f"{mode:<12} {total / result['seconds']:>10.0f} {result['drivers']:>8} "
+              f"{result['connections']:>12} {result['peak_in_use']:>12}")
+        if mode == 'shared':
+            shared = result
+
+    if len(shared['answers']) != total or not all(shared['answers']):
+        raise SystemExit("Not every shared read returned the drug")
+    print(f"\n{total} concurrent reads used {shared['connections']} pooled connections "
+          f"({total / shared['connections']:.0f} reads per connection)")
+
+
+if __name__ == '__main__':
+    main()
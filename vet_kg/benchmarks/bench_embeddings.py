@@ -0,0 +1,110 @@
+"""Memory, recall and batching of the embedding layer with a deterministic stand-in encoder.
+
+Encodes the passages of a synthetic formulary with `HashingEncoder`, stores them as
+float32, float16 and int8, and reports the memory of each store and its recall@k
+against exact float32 search. It then fires concurrent queries at `EmbeddingService`
+to show how they are batched and cached. The service and the store of the configured
+`embeddings.corpus_dtype` are built from config.yaml as the chatbot would build them,
+and the run fails if that store's recall@k drops below `--min-recall`.
+
+Usage (from vet_kg/):
+    python -m benchmarks.bench_embeddings --drugs 10000 --queries 500 --threads 16
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import yaml
+
+from benchmarks import SRC_DIR
+from benchmarks.synthetic import generate_formulary, generate_queries
+from embeddings import DTYPES, HashingEncoder, QuantizedVectorStore, create_embedding_service, create_vector_store
+
+CONFIG_PATH = os.path.join(os.path.dirname(SRC_DIR), 'config.yaml')
+
+
+def passages(drugs):
+    """Split each drug record into one passage per section, as a semantic index would."""
+    for drug in drugs:
+        for section, text in drug.items():
+            if section != 'Medicine Name':
+                yield f"{drug['Medicine Name']}|{section}", f"{drug['Medicine Name']}. {section}: {text}"
+
+
+def recall_at_k(store: QuantizedVectorStore, exact: QuantizedVectorStore, queries: np.ndarray, k: int):
+    hits = 0
+    for query in queries:
+        expected = {doc_id for doc_id, _ in exact.search(query, k)}
+        hits += len(expected & {doc_id for doc_id, _ in store.search(query, k)})
+    return hits / (len(queries) * k)
+
+
+def mean_search_ms(store: QuantizedVectorStore, queries: np.ndarray, k: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        store.search(query, k)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--drugs', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--min-recall', type=float, default=0.9, help='required recall@k of the configured dtype')
+    parser.add_argument('--config', default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        embeddings_config = yaml.safe_load(f).get('embeddings', {})
+
+    drugs = generate_formulary(args.drugs)
+    ids, texts = zip(*passages(drugs))
+    queries = generate_queries(drugs, args.queries)
+    service = create_embedding_service(embeddings_config, HashingEncoder(args.dim))
+
+    start = time.perf_counter()
+    corpus = service.encode_corpus(texts)
+    print(f"Encoded {len(texts)} passages in {time.perf_counter() - start:.1f}s\n")
+
+    query_vectors = service.encode_corpus(queries)
+    configured = create_vector_store(embeddings_config, args.dim)
+    # float32 first: it is the exact baseline the others are compared against
+    stores = {dtype: configured if dtype == configured.dtype else QuantizedVectorStore(args.dim, dtype)
+              for dtype in reversed(DTYPES)}
+    for store in stores.values():
+        store.add(ids, corpus)
+
+    print(f"{'dtype':<8} {'MiB':>8} {'vs f32':>8} {f'recall@{args.k}':>10} {'search ms':>10}")
+    results = {}
+    for dtype, store in stores.items():
+        recall = recall_at_k(store, stores['float32'], query_vectors, args.k)
+        results[dtype] = recall
+        marker = '*' if store is configured else ''
+        print(f"{dtype + marker:<8} {store.nbytes / 2 ** 20:>8.2f} {store.nbytes / stores['float32'].nbytes:>8.2f} "
+              f"{recall:>10.3f} {mean_search_ms(store, query_vectors, args.k):>10.2f}")
+
+    # Concurrent queries, half of them repeats, through the micro-batcher and cache
+    workload = queries + queries[:len(queries) // 2]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(service.encode_query, workload))
+    seconds = time.perf_counter() - start
+    service.close()
+    stats = service.stats()
+    print(f"\n{len(workload)} concurrent queries in {seconds:.2f}s: {stats['batches']} batches "
+          f"(mean size {stats['mean_batch_size']:.1f}), cache hits {stats['cache_hits']}, "
+          f"misses {stats['cache_misses']}")
+
+    print(f"* embeddings.corpus_dtype in {args.config}")
+    if results[configured.dtype] < args.min_recall:
+        raise SystemExit(f"{configured.dtype} recall@{args.k} {results[configured.dtype]:.3f} "
+                         f"is below {args.min_recall}")
+
+
+if __name__ == '__main__':
+    main()
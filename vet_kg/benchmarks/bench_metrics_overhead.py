@@ -0,0 +1,95 @@
+"""Measure the per-query cost of the chatbot instrumentation.
+
+Replays the instrumentation calls made by `VetPharmacyBot.process_query` around a
+simulated pipeline and compares against the same pipeline with metrics disabled.
+The overhead column relates the instrumentation cost to a loaded query; real queries
+spend milliseconds in spaCy and Neo4j, so production overhead is smaller still.
+
+Usage (from vet_kg/):
+    python -m benchmarks.bench_metrics_overhead --queries 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks import SRC_DIR  # noqa: F401  (puts src/ on sys.path)
+from metrics import MetricsRegistry, SamplingProfiler
+
+INTENTS = ('usage', 'side_effects', 'contraindications', 'interactions', 'storage', 'general')
+
+
+def _work(iterations: int):
+    """Burn a little CPU, standing in for one pipeline stage."""
+    total = 0
+    for i in range(iterations):
+        total += i * i
+    return total
+
+
+def simulated_query(metrics: MetricsRegistry, profiler: SamplingProfiler, n: int, stage_work: int):
+    """Run one query through the same instrumentation points as `process_query`."""
+    with profiler.profile('bench'), metrics.stage('total'):
+        with metrics.stage('session_lookup'):
+            pass
+        metrics.inc('vet_chatbot_cache_requests_total', (('cache', 'session'), ('result', 'miss')))
+        with metrics.stage('analyze'):
+            _work(stage_work)
+        metrics.inc('vet_chatbot_queries_total', (('intent', INTENTS[n % len(INTENTS)]),))
+        with metrics.stage('knowledge_graph'):
+            _work(stage_work)
+        with metrics.stage('format'):
+            _work(stage_work // 10)
+
+
+def run(queries: int, stage_work: int, metrics: MetricsRegistry, profiler: SamplingProfiler) -> float:
+    start = time.perf_counter()
+    for n in range(queries):
+        simulated_query(metrics, profiler, n, stage_work)
+    return (time.perf_counter() - start) / queries
+
+
+def best_of(rounds: int, queries: int, stage_work: int, metrics: MetricsRegistry,
+            profiler: SamplingProfiler) -> float:
+    """Warm up, then take the best of a few rounds to reduce scheduler noise."""
+    run(min(queries, 1000), stage_work, metrics, profiler)
+    return min(run(queries, stage_work, metrics, profiler) for _ in range(rounds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--stage-work', type=int, default=2000, help='loop iterations per simulated stage')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--max-overhead-us', type=float, default=50.0,
+                        help='fail if instrumentation costs more than this per query')
+    args = parser.parse_args()
+
+    dump_file = os.path.join(tempfile.mkdtemp(), 'slow_requests.folded')
+    configs = {
+        'disabled': lambda: (MetricsRegistry(enabled=False), SamplingProfiler(enabled=False)),
+        'metrics': lambda: (MetricsRegistry(enabled=True), SamplingProfiler(enabled=False)),
+        'metrics+profiler': lambda: (MetricsRegistry(enabled=True),
+                                     SamplingProfiler(enabled=True, threshold_ms=1000, output_file=dump_file)),
+    }
+
+    # The empty pipeline isolates the instrumentation cost; the loaded one puts it in proportion
+    print(f"{'configuration':<18} {'empty us/query':>15} {'cost us':>9} {'loaded us/query':>16} {'overhead':>9}")
+    empty_baseline = loaded_baseline = None
+    costs = {}
+    for name, factory in configs.items():
+        empty = best_of(args.rounds, args.queries, 0, *factory())
+        loaded = best_of(args.rounds, args.queries // 10, args.stage_work, *factory())
+        if empty_baseline is None:
+            empty_baseline, loaded_baseline = empty, loaded
+        costs[name] = (empty - empty_baseline) * 1e6
+        overhead = costs[name] / (loaded_baseline * 1e6) * 100
+        print(f"{name:<18} {empty * 1e6:>15.2f} {costs[name]:>9.2f} {loaded * 1e6:>16.2f} {overhead:>8.2f}%")
+
+    if costs['metrics'] > args.max_overhead_us:
+        raise SystemExit(f"Instrumentation costs {costs['metrics']:.2f}us per query, "
+                         f"above the {args.max_overhead_us}us budget")
+
+
+if __name__ == '__main__':
+    main()
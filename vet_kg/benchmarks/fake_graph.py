@@ -0,0 +1,288 @@
+"""In-memory stand-in for the Neo4j driver, understanding the Cypher statements this repo issues.
+
+It is not a Cypher engine: statements are recognised by shape and evaluated against
+dictionaries, which is enough to drive the importer, graph builder and chatbot without a
+database server.
+"""
+import itertools
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+_REL_MERGE = re.compile(r'MERGE \((\w+):(\w+) \{(\w+): \$(\w+)\}\) MERGE \(d\)-\[:(\w+)\]->\(\1\)')
+_RETURN_ITEM = re.compile(r'(\w+)\s*(?:,|$)')
+
+# Relationship types the chatbot reads, with the node property it collects from them.
+_REL_PROPERTY = {
+    'HAS_DOSAGE': 'description',
+    'HAS_SIDE_EFFECT': 'name',
+    'CONTRAINDICATED_FOR': 'name',
+    'TREATS': 'name',
+}
+
+
+class FakeRecord(dict):
+    """Dictionary with the parts of the `neo4j.Record` API used in this repo."""
+
+    def data(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+class FakeResult:
+    """Eagerly materialised result of one statement."""
+
+    def __init__(self, records: List[FakeRecord]):
+        self._records = records
+
+    def single(self) -> Optional[FakeRecord]:
+        return self._records[0] if self._records else None
+
+    def data(self) -> List[Dict[str, Any]]:
+        return [record.data() for record in self._records]
+
+    def consume(self):
+        return None
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class FakeGraph:
+    """Nodes keyed by (label, key value) with relationships stored as adjacency lists."""
+
+    def __init__(self, latency: float = 0.0, connect_latency: float = 0.0):
+        self.nodes: Dict[tuple, Dict[str, Any]] = {}
+        self.edges: Dict[tuple, List[tuple]] = {}
+        self.incoming: Dict[tuple, List[tuple]] = {}
+        self.statements = 0
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self._lock = threading.Lock()
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResult:
+        params = dict(parameters or {}, **kwargs)
+        query = ' '.join(query.split())
+        if self.latency:
+            # Simulated network round-trip, during which the connection stays checked out
+            time.sleep(self.latency)
+        with self._lock:
+            self.statements += 1
+            return FakeResult(self._execute(query, params))
+
+    def _execute(self, query: str, params: Dict[str, Any]) -> List[FakeRecord]:
+        if query.startswith('CREATE CONSTRAINT'):
+            return []
+        if query == 'MATCH (n) DETACH DELETE n':
+            self.nodes.clear()
+            self.edges.clear()
+            self.incoming.clear()
+            return []
+        if query.startswith('CREATE (d:Drug'):
+            self.nodes[('Drug', params['name'])] = dict(params)
+            self.edges.setdefault(('Drug', params['name']), [])
+            return []
+        if query.startswith('MERGE (d:Drug {name: $name}) SET'):
+            self.nodes.setdefault(('Drug', params['name']), {}).update(params)
+            self.edges.setdefault(('Drug', params['name']), [])
+            return []
+        if query.startswith('MATCH (d:Drug {name: $drug_name}) MERGE'):
+            return self._merge_relationship(query, params)
+        if query.startswith('MATCH (n)-[r]->(m)'):
+            return [FakeRecord(source=self.nodes[src].get('name'), target=self.nodes[dst].get('name'), type=rel)
+                    for src, targets in self.edges.items() for rel, dst in targets]
+        if query.startswith('MATCH (n) WHERE n.name = $name SET n.community'):
+            for node in self.nodes.values():
+                if node.get('name') == params['name']:
+                    node['community'] = params['community']
+            return []
+        if query.startswith(('MATCH (d:Drug {name: $drug_name})', 'MATCH (d1:Drug {name: $drug_name})')):
+            return self._read_drug(query, params['drug_name'])
+        if query == 'MATCH (d:Drug) RETURN d.name as name':
+            return [FakeRecord(name=node.get('name')) for (label, _), node in self.nodes.items() if label == 'Drug']
+        if query.startswith('MATCH (d:Drug) OPTIONAL'):
+            return [record for label, name in list(self.nodes) if label == 'Drug'
+                    for record in self._read_drug(query, name)]
+        raise NotImplementedError(f"FakeGraph does not understand: {query}")
+
+    def _merge_relationship(self, query: str, params: Dict[str, Any]) -> List[FakeRecord]:
+        match = _REL_MERGE.search(query)
+        drug_key = ('Drug', params['drug_name'])
+        if match is None or drug_key not in self.nodes:
+            return []
+        _, label, key, param, rel_type = match.groups()
+        target_key = (label, params[param])
+        self.nodes.setdefault(target_key, {key: params[param], 'name': params[param]})
+        if (rel_type, target_key) not in self.edges[drug_key]:
+            self.edges[drug_key].append((rel_type, target_key))
+            self.incoming.setdefault(target_key, []).append((rel_type, drug_key))
+        return []
+
+    def _read_drug(self, query: str, drug_name: str) -> List[FakeRecord]:
+        drug = self.nodes.get(('Drug', drug_name))
+        if drug is None:
+            return []
+        related: Dict[str, List[Any]] = {}
+        for rel_type, target_key in self.edges.get(('Drug', drug_name), []):
+            related.setdefault(rel_type, []).append(self.nodes[target_key].get(_REL_PROPERTY.get(rel_type, 'name')))
+        interacting = [self.nodes[src].get('name') for rel, src in self.incoming.get(('Drug', drug_name), [])
+                       if rel == 'INTERACTS_WITH']
+        interacting += [self.nodes[dst].get('name') for rel, dst in self.edges.get(('Drug', drug_name), [])
+                        if rel == 'INTERACTS_WITH']
+        values = {
+            'd': dict(drug),
+            'name': drug.get('name'),
+            'properties': dict(drug),
+            'uses': drug.get('uses'),
+            'dosage': (related.get('HAS_DOSAGE') or [None])[0],
+            'effects': drug.get('adverse_effects'),
+            'specific_effects': related.get('HAS_SIDE_EFFECT', []),
+            'warnings': drug.get('contraindications'),
+            'specific_contraindications': related.get('CONTRAINDICATED_FOR', []),
+            'interacting_drugs': interacting,
+            'storage': drug.get('storage'),
+        }
+        returned = query.rsplit('RETURN', 1)[1]
+        return [FakeRecord((alias, values.get(alias)) for alias in _RETURN_ITEM.findall(returned))]
+
+
+class FakeConnectionPool:
+    """Bounded pool of fake connections, counting how often they are created and reused."""
+
+    def __init__(self, max_size: int = 100, acquisition_timeout: float = 60.0, connect_latency: float = 0.0):
+        self.max_size = max_size
+        self.acquisition_timeout = acquisition_timeout
+        self.connect_latency = connect_latency
+        self.created = 0
+        self.acquisitions = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._idle: List[int] = []
+        self._ids = itertools.count(1)
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def acquire(self) -> int:
+        if not self._slots.acquire(timeout=self.acquisition_timeout):
+            raise TimeoutError(f"No connection available within {self.acquisition_timeout}s")
+        with self._lock:
+            self.acquisitions += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+            connection = next(self._ids)
+        if self.connect_latency:
+            # Simulated TCP, TLS and Bolt handshake of a new connection
+            time.sleep(self.connect_latency)
+        return connection
+
+    def release(self, connection: int):
+        with self._lock:
+            self.in_use -= 1
+            self._idle.append(connection)
+        self._slots.release()
+
+
+class FakeTransaction:
+    """Transaction handed to transaction functions by `FakeSession.execute_read`."""
+
+    def __init__(self, graph: FakeGraph):
+        self.graph = graph
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResult:
+        return self.graph.run(query, parameters, **kwargs)
+
+
+class FakeSession:
+    """Session bound to a `FakeGraph`, borrowing a pooled connection for each unit of work."""
+
+    def __init__(self, driver: 'FakeDriver', **config):
+        self.driver = driver
+        self.graph = driver.graph
+        self.config = config
+        self.closed = False
+
+    def run(self, query: str, parameters: Optional[Dict[str, Any]] = None, **kwargs) -> FakeResult:
+        connection = self.driver.pool.acquire()
+        try:
+            return self.graph.run(query, parameters, **kwargs)
+        finally:
+            self.driver.pool.release(connection)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._execute(work, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._execute(work, *args, **kwargs)
+
+    def _execute(self, work, *args, **kwargs):
+        connection = self.driver.pool.acquire()
+        try:
+            return work(FakeTransaction(self.graph), *args, **kwargs)
+        finally:
+            self.driver.pool.release(connection)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class FakeDriver:
+    """Driver handing out sessions on a shared `FakeGraph`."""
+
+    def __init__(self, graph: FakeGraph, **config):
+        self.graph = graph
+        self.config = config
+        self.pool = FakeConnectionPool(config.get('max_connection_pool_size', 100),
+                                       config.get('connection_acquisition_timeout', 60.0),
+                                       graph.connect_latency)
+        self.sessions_opened = 0
+        self.closed = False
+
+    def session(self, **config) -> FakeSession:
+        if self.closed:
+            raise RuntimeError("Driver closed")
+        self.sessions_opened += 1
+        return FakeSession(self, **config)
+
+    def verify_connectivity(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeGraphDatabase:
+    """Replacement for `neo4j.GraphDatabase` that connects every driver to one `FakeGraph`."""
+
+    def __init__(self, graph: FakeGraph):
+        self.graph = graph
+        self.drivers: List[FakeDriver] = []
+
+    def driver(self, uri: str, auth=None, **config) -> FakeDriver:
+        driver = FakeDriver(self.graph, **config)
+        self.drivers.append(driver)
+        return driver
+
+
+@contextmanager
+def patch_graph_database(graph: FakeGraph, *modules):
+    """Make the given modules connect to `graph` instead of a Neo4j server."""
+    originals = [(module, module.GraphDatabase) for module in modules]
+    fake = FakeGraphDatabase(graph)
+    try:
+        for module in modules:
+            module.GraphDatabase = fake
+        yield fake
+    finally:
+        for module, original in originals:
+            module.GraphDatabase = original
@@ -0,0 +1,343 @@
+"""End-to-end benchmarks for preprocessing, import, graph building and query answering.
+
+Every (stage, size) pair runs in a fresh process against a `FakeGraph`, so peak RSS is
+measured per stage and no Neo4j server is needed. spaCy and the other requirements must be
+installed.
+
+Usage (from vet_kg/):
+    python -m benchmarks.run run --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.run compare baseline.json results.json --threshold 0.1
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from benchmarks import SRC_DIR
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+from benchmarks.synthetic import (generate_formulary, generate_queries, write_importer_input,
+                                  write_monographs, write_preprocessor_input)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ('ingest', 'preprocess', 'import', 'build', 'query', 'materialize', 'lookup')
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Below this share of answered queries the query stage fails instead of reporting misleading timings
+MIN_QUERY_HIT_RATE = 0.1
+CONFIG_PATH = os.path.join(os.path.dirname(SRC_DIR), 'config.yaml')
+
+# Direction in which each recorded metric improves, used by compare mode.
+HIGHER_IS_BETTER = {'throughput': True, 'p50_ms': False, 'p95_ms': False, 'p99_ms': False,
+                    'peak_rss_mb': False, 'worker_peak_rss_mb': False}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """Peak resident set size of the current process, or of its largest finished child, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def summarize(items: int, seconds: float, latencies: List[float], **extra) -> Dict[str, Any]:
+    """Build the result entry of one (stage, size) run."""
+    latencies = sorted(latencies)
+    to_ms = lambda value: None if value is None else round(value * 1000, 4)
+    return {
+        'items': items,
+        'seconds': round(seconds, 4),
+        'throughput': round(items / seconds, 2) if seconds else None,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+        'peak_rss_mb': peak_rss_mb(),
+        **extra,
+    }
+
+
+def timed_each(items, func: Callable) -> tuple:
+    """Call `func` on every item, returning total seconds and per-item latencies."""
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        item_start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - item_start)
+    return time.perf_counter() - start, latencies
+
+
+def write_config(workdir: str, importer_input: str) -> str:
+    """Write a copy of config.yaml pointing data and logs into the work directory."""
+    with open(CONFIG_PATH, 'r') as f:
+        config = yaml.safe_load(f)
+    config['neo4j'] = {'uri': 'bolt://fake:7687', 'user': 'neo4j', 'password': 'benchmark'}
+    config['data']['input_file'] = importer_input
+    # Per-drug INFO lines would dominate the import timing and flood the console
+    config['logging'] = {'level': 'WARNING', 'file': os.path.join(workdir, 'logs', 'bench.log')}
+    config['sessions'] = dict(config.get('sessions', {}), backend='memory')
+    # The query stage measures the live path; the lookup stage measures materialized answers
+    config['answers'] = {'enabled': False, 'artifact_path': os.path.join(workdir, 'answers.db')}
+    path = os.path.join(workdir, 'config.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def bench_ingest(drugs, workdir, config_path, queries):
+    from ingest import MonographIngestor
+
+    input_dir = os.path.join(workdir, 'monographs')
+    os.makedirs(input_dir)
+    write_monographs(drugs, input_dir)
+    ingestor = MonographIngestor(input_dir, os.path.join(workdir, 'ingest_checkpoint.jsonl'))
+    start = time.perf_counter()
+    records = sum(1 for _ in ingestor.ingest())
+    seconds = time.perf_counter() - start
+    # Parsing happens in the pool workers, which peak_rss_mb leaves out; their peak is reported separately
+    # Throughput is in files/sec; there are no per-file latencies
+    return summarize(len(drugs), seconds, [], records=records, workers=ingestor.workers,
+                     worker_peak_rss_mb=peak_rss_mb(children=True))
+
+
+def bench_preprocess(drugs, workdir, config_path, queries):
+    from preprocess import DrugDataPreprocessor
+
+    input_file = os.path.join(workdir, 'preprocess_input.txt')
+    write_preprocessor_input(drugs, input_file)
+    preprocessor = DrugDataPreprocessor()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        entries = preprocessor._split_into_drugs(f.read())
+    seconds, latencies = timed_each(entries, preprocessor._process_drug_entry)
+    return summarize(len(entries), seconds, latencies)
+
+
+def bench_import(drugs, workdir, config_path, queries):
+    import import_data
+
+    with patch_graph_database(FakeGraph(), import_data):
+        importer = import_data.DataImporter(config_path)
+        start = time.perf_counter()
+        importer.import_drug_data()
+        seconds = time.perf_counter() - start
+        importer.close()
+    # The importer loops internally, so only throughput is available
+    return summarize(len(drugs), seconds, [])
+
+
+def bench_build(drugs, workdir, config_path, queries):
+    import kg_builder
+
+    with patch_graph_database(FakeGraph(), kg_builder):
+        builder = kg_builder.VetKnowledgeGraphBuilder('bolt://fake:7687', 'neo4j', 'benchmark')
+        builder.create_constraints()
+        seconds, latencies = timed_each(drugs, builder.process_drug_data)
+        builder.close()
+    return summarize(len(drugs), seconds, latencies)
+
+
+def bench_query(drugs, workdir, config_path, queries):
+    import graph_connection
+    import kg_builder
+    import vet_chatbot
+    from responses import NOT_FOUND_RESPONSE
+
+    graph = FakeGraph()
+    with patch_graph_database(graph, kg_builder, graph_connection):
+        builder = kg_builder.VetKnowledgeGraphBuilder('bolt://fake:7687', 'neo4j', 'benchmark')
+        for drug in drugs:
+            builder.process_drug_data(drug)
+        bot = vet_chatbot.VetPharmacyBot(config_path)
+        questions = generate_queries(drugs, queries)
+        responses = []
+        seconds, latencies = timed_each(questions, lambda question: responses.append(bot.process_query(question)))
+        bot.close()
+    # A miss only times spaCy and the "couldn't find" reply, not the graph read and formatting
+    hit_rate = sum(response != NOT_FOUND_RESPONSE for response in responses) / len(responses)
+    if hit_rate < MIN_QUERY_HIT_RATE:
+        raise RuntimeError(f"Only {hit_rate:.1%} of queries found their drug in the graph; "
+                           f"the query stage would not measure graph reads")
+    return summarize(len(questions), seconds, latencies, hit_rate=round(hit_rate, 4))
+
+
+def _materializer(drugs, config_path):
+    """Build the graph and return an `AnswerMaterializer` connected to it."""
+    import graph_connection
+    import kg_builder
+    import materialize
+
+    graph = FakeGraph()
+    with patch_graph_database(graph, kg_builder, graph_connection):
+        builder = kg_builder.VetKnowledgeGraphBuilder('bolt://fake:7687', 'neo4j', 'benchmark')
+        for drug in drugs:
+            builder.process_drug_data(drug)
+        return materialize.AnswerMaterializer(config_path)
+
+
+def bench_materialize(drugs, workdir, config_path, queries):
+    materializer = _materializer(drugs, config_path)
+    start = time.perf_counter()
+    materializer.materialize()
+    seconds = time.perf_counter() - start
+    materializer.store.compact()
+    stats = materializer.store.stats()
+    materializer.close()
+    return summarize(len(drugs), seconds, [], artifact_bytes=stats['artifact_bytes'],
+                     answers=stats['entries'])
+
+
+def bench_lookup(drugs, workdir, config_path, queries):
+    from answer_store import AnswerStore
+    from responses import INTENTS
+
+    materializer = _materializer(drugs, config_path)
+    materializer.materialize()
+    materializer.close()
+
+    store = AnswerStore(os.path.join(workdir, 'answers.db'))
+    rng = random.Random(0)
+    keys = [(rng.choice(drugs)['Medicine Name'].lower(), rng.choice(INTENTS)) for _ in range(queries)]
+    seconds, latencies = timed_each(keys, lambda key: store.get(*key))
+    store.close()
+    return summarize(len(keys), seconds, latencies)
+
+
+BENCHMARKS = {
+    'ingest': bench_ingest,
+    'preprocess': bench_preprocess,
+    'import': bench_import,
+    'build': bench_build,
+    'query': bench_query,
+    'materialize': bench_materialize,
+    'lookup': bench_lookup,
+}
+
+
+def run_stage(stage: str, size: int, seed: int, queries: int) -> Dict[str, Any]:
+    """Run one benchmark; meant to be called in a fresh process."""
+    workdir = tempfile.mkdtemp(prefix=f'vet_kg_bench_{stage}_{size}_')
+    os.makedirs(os.path.join(workdir, 'logs'))
+    os.makedirs(os.path.join(workdir, 'cwd'))
+    # Modules log to paths relative to the working directory, such as ../logs/chatbot.log
+    original_cwd = os.getcwd()
+    os.chdir(os.path.join(workdir, 'cwd'))
+    try:
+        drugs = generate_formulary(size, seed)
+        importer_input = os.path.join(workdir, 'importer_input.txt')
+        write_importer_input(drugs, importer_input)
+        config_path = write_config(workdir, importer_input)
+        return BENCHMARKS[stage](drugs, workdir, config_path, queries)
+    finally:
+        os.chdir(original_cwd)
+        logging.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(args) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    context = multiprocessing.get_context('spawn')
+    for stage in args.stages:
+        for size in args.sizes:
+            print(f"Running {stage} with {size} drugs...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_stage, stage, size, args.seed, args.queries).result()
+            results.setdefault(stage, {})[str(size)] = result
+            print(f"  {result['throughput']} items/s, p95 {result['p95_ms']} ms, "
+                  f"peak RSS {result['peak_rss_mb']} MiB", flush=True)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'queries': args.queries,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every metric that got worse by more than `threshold`."""
+    regressions = []
+    for stage, sizes in current['results'].items():
+        for size, result in sizes.items():
+            previous = baseline['results'].get(stage, {}).get(size)
+            if previous is None:
+                continue
+            for metric, higher_is_better in HIGHER_IS_BETTER.items():
+                old, new = previous.get(metric), result.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                worse = -change if higher_is_better else change
+                status = 'REGRESSION' if worse > threshold else 'ok'
+                print(f"{stage:<11} {size:>7} {metric:<18} {old:>12} -> {new:<12} {change:+8.1%}  {status}")
+                if worse > threshold:
+                    regressions.append(f"{stage}/{size} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    run_parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    run_parser.add_argument('--queries', type=int, default=1000, help='chatbot queries per size')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', default='benchmark_results.json')
+
+    compare_parser = subparsers.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='relative change counted as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == '__main__':
+    main()
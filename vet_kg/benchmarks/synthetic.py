@@ -0,0 +1,135 @@
+"""Synthetic formulary generator modeled on `data/Three_drug_info.txt`."""
+import os
+import random
+from typing import Any, Dict, List
+
+NAME_PREFIXES = ('ACE', 'AMI', 'BENA', 'CARPRO', 'CEFA', 'DEXA', 'DOXY', 'ENRO', 'FLU', 'GABA',
+                 'KETO', 'LEVO', 'MELOXI', 'METRO', 'PHENO', 'PREDNI', 'SELE', 'TRAMA', 'VINCRI', 'ZONI')
+NAME_SUFFIXES = ('BOSE', 'MANNAN', 'PROMAZINE', 'CILLIN', 'ZOLE', 'MYCIN', 'FLOXACIN', 'CAM', 'SONE',
+                 'PENTIN', 'DOL', 'TINE', 'XIB', 'LAMIDE', 'SAMIDE')
+SALTS = ('', '', '', ' MALEATE', ' HYDROCHLORIDE', ' SODIUM', ' SULFATE', ' PHOSPHATE')
+
+SPECIES = ('dogs', 'cats', 'horses', 'cattle', 'ferrets', 'rabbits', 'birds', 'small mammals')
+CONDITIONS = ('diabetes mellitus', 'fibrosarcoma', 'osteoarthritis', 'urinary tract infections',
+              'seizure disorders', 'chronic pain', 'hypothyroidism', 'inflammatory bowel disease',
+              'congestive heart failure', 'pyoderma', 'otitis externa', 'lymphoma', 'anxiety disorders')
+RISK_FACTORS = ('known hypersensitivity to the drug', 'hepatic dysfunction', 'renal insufficiency',
+                'mild cardiac disease', 'general debilitation', 'diabetic ketoacidosis',
+                'gastrointestinal ulceration', 'pregnancy', 'dehydration', 'bleeding disorders')
+EFFECTS = ('vomiting', 'diarrhea', 'soft stools', 'flatulence', 'weight loss', 'lethargy', 'anorexia',
+           'hypotension', 'sedation', 'ataxia', 'localized injection reactions', 'pruritus')
+ROUTES = ('PO', 'IV', 'IM', 'SC')
+
+USES_TEMPLATES = (
+    "May be useful for {condition} in {species} and as adjunctive treatment of {condition2}.",
+    "{name_title} is FDA-approved for use in {species}. Labeled indications include {condition} and {condition2}.",
+    "Veterinary {name_lower} is labeled for use in {species} as an aid in the treatment and clinical management "
+    "of {condition}.",
+)
+CONTRAINDICATION_TEMPLATES = (
+    "{name_title} is contraindicated in patients with {risk}, {risk2} or {risk3}.",
+    "Use cautiously and in smaller doses in animals with {risk} or {risk2}. {name_title} is relatively "
+    "contraindicated in patients with {risk3}.",
+)
+EFFECT_TEMPLATES = (
+    "Adverse effects reported in {species} include {effect}, {effect2} and {effect3}. Adverse effects are more "
+    "likely at higher doses.",
+    "While the manufacturer does not list any specific adverse effects associated with use, {effect} or "
+    "{effect2} are possible.",
+)
+STORAGE_TEMPLATES = (
+    "Do not store tablets above {celsius}°C ({fahrenheit}°F); protect from moisture.",
+    "Store protected from light. Tablets should be stored in tight containers. {name_title} injection should be "
+    "kept from freezing.",
+    "{name_title} injection should be stored at temperatures less than {celsius}°C ({fahrenheit}°F); protect "
+    "from extremes of heat or light.",
+)
+DOSE_TEMPLATE = "{species_title}: {low}–{high} mg/kg {route} once to twice daily."
+
+
+def _drug_name(rng: random.Random, index: int) -> str:
+    base = rng.choice(NAME_PREFIXES) + rng.choice(NAME_SUFFIXES)
+    name = f"{base}-{index}{rng.choice(SALTS)}"
+    # Formularies are not consistent about casing, e.g. "Carpromycin-12 Maleate"
+    return (name, name.title(), name.lower())[index % 3]
+
+
+def generate_drug(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Generate one drug record in the preprocessor input schema."""
+    name = _drug_name(rng, index)
+    species = rng.sample(SPECIES, 2)
+    conditions = rng.sample(CONDITIONS, 2)
+    risks = rng.sample(RISK_FACTORS, 3)
+    effects = rng.sample(EFFECTS, 3)
+    celsius = rng.choice((25, 30, 35))
+    fields = {
+        'name_title': name.split()[0].capitalize(),
+        'name_lower': name.lower(),
+        'species': f"{species[0]} and {species[1]}",
+        'condition': conditions[0],
+        'condition2': conditions[1],
+        'risk': risks[0],
+        'risk2': risks[1],
+        'risk3': risks[2],
+        'effect': effects[0],
+        'effect2': effects[1],
+        'effect3': effects[2],
+        'celsius': celsius,
+        'fahrenheit': round(celsius * 9 / 5 + 32),
+    }
+    doses = []
+    for animal in species:
+        low = round(rng.uniform(0.05, 10), 2)
+        doses.append(DOSE_TEMPLATE.format(species_title=animal.capitalize(), low=low,
+                                          high=round(low * rng.uniform(1.5, 3), 2), route=rng.choice(ROUTES)))
+    return {
+        'Medicine Name': name,
+        'Uses/Indications': rng.choice(USES_TEMPLATES).format(**fields),
+        'Contraindications/Precautions/Warnings': rng.choice(CONTRAINDICATION_TEMPLATES).format(**fields),
+        'Adverse Effects': rng.choice(EFFECT_TEMPLATES).format(**fields),
+        'Storage/Stability': rng.choice(STORAGE_TEMPLATES).format(**fields),
+        'Doses': " ".join(doses),
+    }
+
+
+def generate_formulary(size: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Generate `size` drug records deterministically from `seed`."""
+    rng = random.Random(seed)
+    return [generate_drug(rng, index) for index in range(size)]
+
+
+def write_preprocessor_input(drugs: List[Dict[str, Any]], path: str):
+    """Write records as blank-line separated dict literals, as read by `DrugDataPreprocessor`."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n\n".join(repr(drug) for drug in drugs))
+
+
+def write_importer_input(drugs: List[Dict[str, Any]], path: str):
+    """Write records as a single list literal, as read by `DataImporter`."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(repr(drugs))
+
+
+def write_monographs(drugs: List[Dict[str, Any]], directory: str):
+    """Write one exported-monograph style HTML file per drug, as read by `MonographIngestor`."""
+    for index, drug in enumerate(drugs):
+        sections = "".join(f"<h2>{key}</h2>\n<p>{value}</p>\n" for key, value in drug.items()
+                           if key != 'Medicine Name')
+        with open(os.path.join(directory, f"monograph_{index:06d}.html"), 'w', encoding='utf-8') as f:
+            f.write(f"<html><head><title>{drug['Medicine Name']}</title></head><body>\n"
+                    f"<h1>{drug['Medicine Name']}</h1>\n{sections}</body></html>\n")
+
+
+def generate_queries(drugs: List[Dict[str, Any]], count: int, seed: int = 0) -> List[str]:
+    """Generate chatbot questions covering every intent about random drugs."""
+    rng = random.Random(seed)
+    templates = (
+        "What is the dosage of {name} for {species}?",
+        "What are the side effects of {name}?",
+        "How should I store {name}?",
+        "What are the contraindications for {name} in {species}?",
+        "Does {name} interact with other drugs when given together?",
+        "Tell me about {name}.",
+    )
+    return [rng.choice(templates).format(name=rng.choice(drugs)['Medicine Name'], species=rng.choice(SPECIES))
+            for _ in range(count)]
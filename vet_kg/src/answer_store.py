@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def normalize_drug_name(name: str) -> str:
+    """Key under which a drug's answers are stored, independent of query casing."""
+    return ' '.join(name.split()).upper()
+
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """Stable digest of a drug profile, used to skip re-rendering unchanged drugs."""
+    return hashlib.sha1(json.dumps(profile, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class AnswerStore:
+    """Precomputed answers per (drug, intent), kept in a single SQLite file.
+
+    Answers are zlib-compressed and stored in a WITHOUT ROWID table keyed by
+    (drug, intent), so a lookup is one primary-key probe. The file can be read by
+    every chatbot worker while the importer invalidates drugs it changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                drug TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                answer BLOB NOT NULL,
+                PRIMARY KEY (drug, intent)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS drugs (
+                drug TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, drug: str, intent: str) -> Optional[str]:
+        """Return the materialized answer, or None if it was never rendered or is invalidated."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM answers WHERE drug = ? AND intent = ?", (normalize_drug_name(drug), intent)
+            ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+
+    def fingerprint(self, drug: str) -> Optional[str]:
+        """Return the fingerprint of the profile the drug's answers were rendered from."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM drugs WHERE drug = ?", (normalize_drug_name(drug),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def drugs(self) -> List[str]:
+        """Return the keys of every materialized drug."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT drug FROM drugs")]
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Dict[str, str]]]):
+        """Store the answers of several drugs as `(drug, fingerprint, {intent: answer})` in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for drug, fingerprint, answers in entries:
+                    key = normalize_drug_name(drug)
+                    self._conn.execute("DELETE FROM answers WHERE drug = ?", (key,))
+                    self._conn.executemany(
+                        "INSERT INTO answers (drug, intent, answer) VALUES (?, ?, ?)",
+                        [(key, intent, zlib.compress(answer.encode('utf-8'))) for intent, answer in answers.items()]
+                    )
+                    self._conn.execute("INSERT OR REPLACE INTO drugs (drug, fingerprint) VALUES (?, ?)",
+                                       (key, fingerprint))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def invalidate(self, drug: str):
+        """Drop every answer of a drug, so it is answered live until it is materialized again."""
+        key = normalize_drug_name(drug)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM answers WHERE drug = ?", (key,))
+            self._conn.execute("DELETE FROM drugs WHERE drug = ?", (key,))
+            self._conn.execute("COMMIT")
+
+    def clear(self):
+        """Drop every answer, e.g. before a full re-import."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM answers")
+            self._conn.execute("DELETE FROM drugs")
+            self._conn.execute("COMMIT")
+
+    def compact(self):
+        """Reclaim the space of deleted answers."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry counts and the size of the artifact in bytes."""
+        with self._lock:
+            drugs = self._conn.execute("SELECT count(*) FROM drugs").fetchone()[0]
+            entries, answer_bytes = self._conn.execute(
+                "SELECT count(*), coalesce(sum(length(answer)), 0) FROM answers"
+            ).fetchone()
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return {'drugs': drugs, 'entries': entries, 'answer_bytes': answer_bytes,
+                'artifact_bytes': page_count * page_size}
+
+    def close(self):
+        """Close the SQLite connection."""
+        self._conn.close()
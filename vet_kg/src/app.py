@@ -1,9 +1,12 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from vet_chatbot import VetPharmacyBot
+import atexit
 import logging
 
 app = Flask(__name__)
 bot = VetPharmacyBot()
+# The Neo4j connection pool is shared by all requests and closed once at process exit
+atexit.register(bot.close)
 
 @app.route('/')
 def home():
@@ -13,15 +16,17 @@ def home():
 def query():
     try:
         user_query = request.json['query']
-        response = bot.process_query(user_query)
+        session_id = request.json.get('session_id')
+        response = bot.process_query(user_query, session_id)
         return jsonify({'response': response})
     except Exception as e:
         logging.error(f"Error processing query: {str(e)}")
+        bot.metrics.inc('vet_chatbot_errors_total')
         return jsonify({'response': "I'm sorry, I encountered an error processing your query."}), 500
 
-@app.teardown_appcontext
-def cleanup(error):
-    bot.close()
+@app.route('/metrics')
+def metrics():
+    return Response(bot.metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
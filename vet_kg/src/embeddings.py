@@ -0,0 +1,264 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+DTYPES = ('int8', 'float16', 'float32')
+
+# Rows scored per block during search, bounding the float32 copy of int8 and float16 codes
+SEARCH_BLOCK_ROWS = 4096
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEncoder:
+    """Deterministic local stand-in for a SentenceTransformer, for benchmarks and offline use.
+
+    Unigrams and bigrams are hashed into `dim` signed buckets, so texts sharing words get
+    similar vectors. It exposes the subset of `SentenceTransformer.encode` used here.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _embed(self, text: str, out: np.ndarray):
+        tokens = _TOKEN_RE.findall(text.lower())
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+            out[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            self._embed(text, vectors[row])
+        return _normalize(vectors) if normalize_embeddings else vectors
+
+
+class QuantizedVectorStore:
+    """Corpus embeddings held as int8 (with a per-vector scale), float16 or float32.
+
+    int8 codes are `round(v / scale)` with `scale = max|v| / 127`, so each vector keeps its
+    full range and a score is `(codes @ query) * scale`. Scoring is one vectorized dot
+    product per block of rows, followed by a partial sort for the top k.
+    """
+
+    def __init__(self, dim: int, dtype: str = 'int8'):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown vector dtype: {dtype}")
+        self.dim = dim
+        self.dtype = dtype
+        self.ids: List[Any] = []
+        self.codes = np.empty((0, dim), dtype=dtype)
+        self.scales = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the vectors and their scales."""
+        return self.codes.nbytes + (self.scales.nbytes if self.dtype == 'int8' else 0)
+
+    def quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the stored codes and per-vector scales for float32 `vectors`."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if self.dtype != 'int8':
+            return vectors.astype(self.dtype), np.ones(len(vectors), dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def add(self, ids: Sequence[Any], vectors: np.ndarray):
+        """Append vectors; add in batches, since every call copies the stored codes."""
+        codes, scales = self.quantize(vectors)
+        if len(codes) != len(ids):
+            raise ValueError(f"Got {len(ids)} ids for {len(codes)} vectors")
+        self.ids.extend(ids)
+        self.codes = np.concatenate([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Return the dot product of `query` with every stored vector."""
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), SEARCH_BLOCK_ROWS):
+            block = self.codes[start:start + SEARCH_BLOCK_ROWS]
+            # float32 blocks are scored in place; up-casting float16 is the slowest of the three
+            scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ query
+        if self.dtype == 'int8':
+            scores *= self.scales
+        return scores
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[Any, float]]:
+        """Return the `k` best `(id, score)` pairs for `query`, best first."""
+        if not self.ids:
+            return []
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def save(self, path: str):
+        """Write the store to an `.npz` file."""
+        np.savez(path, ids=np.array(self.ids, dtype=object), codes=self.codes, scales=self.scales)
+
+    @classmethod
+    def load(cls, path: str) -> 'QuantizedVectorStore':
+        """Read a store written by `save`."""
+        with np.load(path, allow_pickle=True) as data:
+            store = cls(data['codes'].shape[1], str(data['codes'].dtype))
+            store.ids = data['ids'].tolist()
+            store.codes = data['codes']
+            store.scales = data['scales']
+        return store
+
+
+class EmbeddingService:
+    """Batched, cached access to a sentence encoder.
+
+    Concurrent `encode_query` calls are queued and a background thread encodes them
+    together: it waits up to `max_wait_ms` after the first query for others to arrive,
+    or until `max_batch_size` are pending. Query embeddings are kept in an LRU cache.
+    """
+
+    def __init__(self, encoder, max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 cache_size: int = 1024, normalize: bool = True):
+        self.encoder = encoder
+        self.dim = encoder.get_sentence_embedding_dimension()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.cache_size = cache_size
+        self.normalize = normalize
+        self._cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        self.counters = {'cache_hits': 0, 'cache_misses': 0, 'batches': 0, 'batched_queries': 0}
+
+    def _encode(self, texts: Sequence[str], batch_size: int) -> np.ndarray:
+        vectors = self.encoder.encode(list(texts), batch_size=batch_size, convert_to_numpy=True,
+                                      normalize_embeddings=self.normalize, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def encode_corpus(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        """Encode passages in batches of `batch_size`, bypassing the query cache."""
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return self._encode(texts, batch_size)
+
+    def encode_query(self, text: str) -> np.ndarray:
+        """Return the embedding of one query, batched with concurrent callers.
+
+        The array is shared with the cache and other callers, so it is read-only; copy it to modify it.
+        """
+        with self._cache_lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+                self.counters['cache_hits'] += 1
+                return vector
+            self.counters['cache_misses'] += 1
+
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("EmbeddingService is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._worker.start()
+            self._pending.append((text, future))
+            self._cond.notify()
+        return future.result()
+
+    def _next_batch(self) -> List[Tuple[str, Future]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                encoded = self._encode(texts, len(texts))
+                # One copy per row, so a cached vector does not keep its whole batch alive
+                vectors = {}
+                for text, row in zip(texts, encoded):
+                    vector = row.copy()
+                    vector.flags.writeable = False
+                    vectors[text] = vector
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._cache_lock:
+                self.counters['batches'] += 1
+                self.counters['batched_queries'] += len(batch)
+                for text, vector in vectors.items():
+                    self._cache[text] = vector
+                    self._cache.move_to_end(text)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache and batching counters."""
+        with self._cache_lock:
+            stats = dict(self.counters, cached=len(self._cache))
+        stats['mean_batch_size'] = stats['batched_queries'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def close(self):
+        """Encode the queries still pending and stop the batching thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join()
+
+
+def create_embedding_service(config: Dict[str, Any], encoder) -> EmbeddingService:
+    """Create the embedding service described by the `embeddings` section of the config."""
+    return EmbeddingService(
+        encoder,
+        max_batch_size=config.get('max_batch_size', 32),
+        max_wait_ms=config.get('max_wait_ms', 5),
+        cache_size=config.get('cache_size', 1024),
+        normalize=config.get('normalize', True)
+    )
+
+
+def create_vector_store(config: Dict[str, Any], dim: int) -> QuantizedVectorStore:
+    """Create an empty corpus store with the `corpus_dtype` of the `embeddings` section of the config."""
+    return QuantizedVectorStore(dim, config.get('corpus_dtype', 'int8'))
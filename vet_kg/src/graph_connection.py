@@ -0,0 +1,62 @@
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+from typing import Any, Callable, Dict
+import logging
+import threading
+
+# Driver settings read from the `neo4j.pool` section of the config.
+POOL_DEFAULTS = {
+    'max_connection_pool_size': 50,
+    'connection_acquisition_timeout': 30.0,
+    'keep_alive': True,
+    'max_connection_lifetime': 3600,
+    'max_transaction_retry_time': 15.0,
+}
+
+class GraphConnection:
+    """Long-lived Neo4j driver with a tuned connection pool and managed transactions.
+
+    One instance should be shared by every request of a process: the driver keeps
+    connections open in its pool and hands them to the short-lived sessions opened by
+    `read` and `write`. Transaction functions are retried by the driver on transient
+    errors for up to `max_transaction_retry_time` seconds, so they must be idempotent.
+    """
+
+    def __init__(self, neo4j_config: Dict[str, Any]):
+        self.database = neo4j_config.get('database', 'neo4j')
+        self.fetch_size = neo4j_config.get('fetch_size', 1000)
+        self.pool_config = dict(POOL_DEFAULTS, **neo4j_config.get('pool', {}))
+        self.driver = GraphDatabase.driver(
+            neo4j_config['uri'],
+            auth=(neo4j_config['user'], neo4j_config['password']),
+            **self.pool_config
+        )
+        self.logger = logging.getLogger(__name__)
+        self._closed = False
+        self._close_lock = threading.Lock()
+
+    def session(self, access_mode: str = READ_ACCESS):
+        """Open a session on the configured database."""
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=access_mode,
+            fetch_size=self.fetch_size
+        )
+
+    def read(self, work: Callable, *args, **kwargs) -> Any:
+        """Run `work(tx, *args, **kwargs)` in a managed read transaction."""
+        with self.session(READ_ACCESS) as session:
+            return session.execute_read(work, *args, **kwargs)
+
+    def write(self, work: Callable, *args, **kwargs) -> Any:
+        """Run `work(tx, *args, **kwargs)` in a managed write transaction."""
+        with self.session(WRITE_ACCESS) as session:
+            return session.execute_write(work, *args, **kwargs)
+
+    def close(self):
+        """Close the driver and its connection pool; later calls do nothing."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.driver.close()
+        self.logger.info("Closed Neo4j connection pool")
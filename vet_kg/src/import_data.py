@@ -1,4 +1,5 @@
 from neo4j import GraphDatabase
+from answer_store import AnswerStore, normalize_drug_name
 import yaml
 import json
 import ast
@@ -10,6 +11,7 @@ class DataImporter:
         self.load_config(config_path)
         self.setup_logging()
         self.connect_to_neo4j()
+        self.setup_answer_store()
 
     def load_config(self, config_path):
         """Load configuration from yaml file."""
@@ -36,6 +38,13 @@ class DataImporter:
             auth=(neo4j_config['user'], neo4j_config['password'])
         )
 
+    def setup_answer_store(self):
+        """Open the materialized answers, if enabled, so the import can invalidate them."""
+        answers_config = self.config.get('answers', {})
+        self.answer_store = None
+        if answers_config.get('enabled', False):
+            self.answer_store = AnswerStore(answers_config['artifact_path'])
+
     def read_drug_data(self):
         """Read drug data from input file."""
         input_file = self.config['data']['input_file']
@@ -58,6 +67,8 @@ class DataImporter:
         with self.driver.session() as session:
             # Clear existing data
             session.run("MATCH (n) DETACH DELETE n")
+            if self.answer_store is not None:
+                self.answer_store.clear()
             
             for drug in drug_data:
                 try:
@@ -71,7 +82,7 @@ class DataImporter:
                             storage: $storage
                         })
                     """, {
-                        'name': drug['Medicine Name'],
+                        'name': normalize_drug_name(drug['Medicine Name']),
                         'uses': drug.get('Uses/Indications', ''),
                         'contraindications': drug.get('Contraindications/Precautions/Warnings', ''),
                         'adverse_effects': drug.get('Adverse Effects', ''),
@@ -85,6 +96,8 @@ class DataImporter:
     def close(self):
         """Close the Neo4j driver connection."""
         self.driver.close()
+        if self.answer_store is not None:
+            self.answer_store.close()
 
 def main():
     importer = DataImporter()
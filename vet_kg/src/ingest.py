@@ -0,0 +1,266 @@
+import fnmatch
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from bs4 import BeautifulSoup, Comment, NavigableString
+import yaml
+
+# Section headings found in exported monographs, mapped to the preprocessor record keys.
+SECTION_PATTERNS = {
+    'Uses/Indications': r'uses?|indications?|uses\s*/\s*indications|clinical uses?',
+    'Contraindications/Precautions/Warnings': r'contraindications?|precautions?|warnings?'
+                                              r'|contraindications\s*/\s*precautions\s*/\s*warnings',
+    'Adverse Effects': r'adverse effects?|side effects?|adverse reactions?',
+    'Doses': r'doses?|dosages?|dosage and administration',
+    'Storage/Stability': r'storage|stability|storage\s*/\s*stability',
+}
+
+# Other sections found in exported monographs; they are not used, but end the section before them.
+OTHER_SECTION_PATTERN = (r'pharmacology|actions?|mechanism of action|pharmacokinetics|overdosage|acute toxicity'
+                         r'|toxicity|drug interactions?|interactions?|laboratory considerations|monitoring'
+                         r'|client information|chemistry|synonyms|dosage forms|regulatory status|description'
+                         r'|references?|compatibility|availability')
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+# Exports often mark sections with bold paragraphs or definition terms instead of headings
+INLINE_HEADING_TAGS = ('strong', 'b', 'dt')
+NAME_LABELS = ('medicine name', 'drug name', 'name')
+HTML_EXTENSIONS = ('.html', '.htm')
+
+_SECTION_RES = [(key, re.compile(rf'^\s*(?:{pattern})\s*:?\s*$', re.IGNORECASE))
+                for key, pattern in SECTION_PATTERNS.items()]
+_OTHER_SECTION_RE = re.compile(rf'^\s*(?:{OTHER_SECTION_PATTERN})(?:\s*/\s*(?:{OTHER_SECTION_PATTERN}))*\s*:?\s*$',
+                               re.IGNORECASE)
+# "Storage: Store below 25°C" in plain-text monographs
+_INLINE_SECTION_RE = re.compile(r'^\s*([A-Za-z][A-Za-z /&-]{2,60}?)\s*:\s*(\S.*)$')
+
+
+def match_section(heading: str) -> Optional[str]:
+    """Return the record key for a section heading, or None if the section is not used."""
+    for key, pattern in _SECTION_RES:
+        if pattern.match(heading):
+            return key
+    return None
+
+
+def is_section_label(label: str) -> bool:
+    """Return whether a label such as "Drug Interactions:" names a known section, used or not.
+
+    Other labels, such as "Dogs:" or "Important:", stay in the section they appear in.
+    """
+    return match_section(label) is not None or bool(_OTHER_SECTION_RE.match(label))
+
+
+def _join(parts: List[str]) -> str:
+    return re.sub(r'\s+', ' ', ' '.join(parts)).strip()
+
+
+def parse_html(html: str) -> Dict[str, str]:
+    """Extract a drug record from an HTML monograph, splitting sections by heading.
+
+    Headings naming a known section end the section before it; sections that map to no
+    record key are dropped.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+
+    record: Dict[str, str] = {}
+    title = soup.find('h1') or soup.find('title')
+    if title is not None:
+        record['Medicine Name'] = _join([title.get_text(' ')])
+
+    headings = [tag for tag in soup.find_all(HEADING_TAGS + INLINE_HEADING_TAGS)
+                if tag.find_parent(HEADING_TAGS) is None and is_section_label(tag.get_text(' '))]
+    boundaries = {id(tag) for tag in headings}
+    for heading in headings:
+        key = match_section(heading.get_text(' '))
+        if key is None:
+            continue
+        inside = {id(element) for element in heading.descendants}
+        parts = []
+        for element in heading.next_elements:
+            if id(element) in inside:
+                continue
+            if id(element) in boundaries:
+                break
+            if isinstance(element, NavigableString) and not isinstance(element, Comment):
+                parts.append(str(element))
+        text = _join(parts)
+        if text:
+            record[key] = f"{record[key]} {text}" if key in record else text
+    return record
+
+
+def parse_text(text: str) -> Dict[str, str]:
+    """Extract a drug record from a plain-text monograph with one heading or "Heading: text" per line.
+
+    Lines naming a known section end the section before it; sections that map to no record
+    key are dropped.
+    """
+    record: Dict[str, str] = {}
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        inline = _INLINE_SECTION_RE.match(line)
+        if inline and inline.group(1).strip().lower() in NAME_LABELS:
+            record['Medicine Name'] = inline.group(2).strip()
+            continue
+        if 'Medicine Name' not in record:
+            record['Medicine Name'] = line.strip()
+            continue
+        if is_section_label(line):
+            current = match_section(line)
+            continue
+        if inline and is_section_label(inline.group(1)):
+            current = match_section(inline.group(1))
+            if current is not None:
+                sections.setdefault(current, []).append(inline.group(2))
+            continue
+        if current is not None:
+            sections.setdefault(current, []).append(line)
+    for key, parts in sections.items():
+        record[key] = _join(parts)
+    return record
+
+
+def parse_monograph(path: str) -> Tuple[str, Optional[Dict[str, str]]]:
+    """Parse one monograph file; runs in a worker process. Returns None for files without sections."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        record = parse_html(content) if path.lower().endswith(HTML_EXTENSIONS) else parse_text(content)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error parsing {path}: {str(e)}")
+        return path, None
+    if not record.get('Medicine Name') or len(record) == 1:
+        return path, None
+    return path, record
+
+
+class MonographIngestor:
+    """Convert a directory of monograph files into preprocessor records, resumably and in parallel.
+
+    Files are parsed by a process pool and each record is passed through `transform`
+    (typically `DrugDataPreprocessor.process_record`) in this process as it arrives. Every
+    finished file is appended to a JSON-lines checkpoint, so an interrupted run skips
+    the files it already handled, unless they changed since.
+    """
+
+    def __init__(self, input_dir: str, checkpoint_file: str, patterns=('*.html', '*.htm', '*.txt'),
+                 workers: Optional[int] = None, chunksize: int = 16, checkpoint_every: int = 100):
+        self.input_dir = input_dir
+        self.checkpoint_file = checkpoint_file
+        self.patterns = tuple(patterns)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.checkpoint_every = checkpoint_every
+        self.files_per_second = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    def find_files(self) -> List[str]:
+        """Return the monograph files under the input directory, in a stable order."""
+        paths = []
+        for root, _, files in os.walk(self.input_dir):
+            for name in files:
+                if any(fnmatch.fnmatch(name.lower(), pattern) for pattern in self.patterns):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """Return the checkpoint entries of finished files, keyed by path relative to the input directory."""
+        done: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.checkpoint_file):
+            return done
+        with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a truncated last line
+                    continue
+                done[entry['file']] = entry
+        return done
+
+    def _file_key(self, path: str) -> Tuple[str, float]:
+        return os.path.relpath(path, self.input_dir), os.path.getmtime(path)
+
+    def ingest(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the record of every monograph, including those finished by earlier runs."""
+        done = self.load_checkpoint()
+        pending = []
+        for path in self.find_files():
+            relpath, mtime = self._file_key(path)
+            entry = done.get(relpath)
+            if entry is not None and entry['mtime'] == mtime:
+                if entry['record'] is not None:
+                    yield entry['record']
+            else:
+                pending.append(path)
+        self.logger.info(f"Ingesting {len(pending)} files, {len(done)} already checkpointed")
+
+        start = time.perf_counter()
+        processed = 0
+        with open(self.checkpoint_file, 'a+', encoding='utf-8') as checkpoint, \
+                multiprocessing.Pool(self.workers) as pool:
+            # Terminate a line truncated by a killed run so the next entry starts cleanly
+            if checkpoint.tell() > 0:
+                checkpoint.seek(checkpoint.tell() - 1)
+                if checkpoint.read(1) != "\n":
+                    checkpoint.write("\n")
+            for path, record in pool.imap_unordered(parse_monograph, pending, chunksize=self.chunksize):
+                if record is not None and transform is not None:
+                    try:
+                        record = transform(record)
+                    except Exception as e:
+                        self.logger.error(f"Error processing {path}: {str(e)}")
+                        record = None
+                relpath, mtime = self._file_key(path)
+                checkpoint.write(json.dumps({'file': relpath, 'mtime': mtime, 'record': record},
+                                            ensure_ascii=False) + "\n")
+                processed += 1
+                if processed % self.checkpoint_every == 0:
+                    checkpoint.flush()
+                    elapsed = time.perf_counter() - start
+                    self.logger.info(f"Ingested {processed}/{len(pending)} files ({processed / elapsed:.1f} files/sec)")
+                if record is not None:
+                    yield record
+
+        elapsed = time.perf_counter() - start
+        self.files_per_second = processed / elapsed if elapsed else 0.0
+        self.logger.info(f"Ingested {processed} files in {elapsed:.1f}s ({self.files_per_second:.1f} files/sec)")
+
+
+def main():
+    from preprocess import DrugDataPreprocessor
+
+    with open('../config.yaml', 'r') as f:
+        config = yaml.safe_load(f)
+    ingest_config = config['ingest']
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    ingestor = MonographIngestor(
+        ingest_config['input_dir'],
+        ingest_config['checkpoint_file'],
+        patterns=ingest_config.get('patterns', ('*.html', '*.htm', '*.txt')),
+        workers=ingest_config.get('workers'),
+        chunksize=ingest_config.get('chunksize', 16)
+    )
+    preprocessor = DrugDataPreprocessor()
+    output_file = ingest_config['output_file']
+
+    processed_data = list(ingestor.ingest(preprocessor.process_record))
+    preprocessor.save_to_json(processed_data, output_file)
+
+    print(f"Processed {len(processed_data)} drug entries")
+    print(f"Throughput: {ingestor.files_per_second:.1f} files/sec")
+    print(f"Data saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,13 @@ from typing import Dict, List, Any
 import logging
 import yaml
 from datetime import datetime
+from answer_store import AnswerStore, normalize_drug_name
 
 class VetKnowledgeGraphBuilder:
-    def __init__(self, uri: str, user: str, password: str):
+    def __init__(self, uri: str, user: str, password: str, answer_store: AnswerStore = None):
         """Initialize the knowledge graph builder with Neo4j connection details."""
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.answer_store = answer_store
         self.graph = nx.Graph()
         self.setup_logging()
         
@@ -41,6 +43,8 @@ class VetKnowledgeGraphBuilder:
 
     def process_drug_data(self, drug_data: Dict[str, Any]):
         """Process drug data and create nodes and relationships."""
+        # Drugs are stored under their normalized name, which queries are matched against
+        drug_data = dict(drug_data, **{'Medicine Name': normalize_drug_name(drug_data['Medicine Name'])})
         with self.driver.session() as session:
             # Create Drug node
             drug_query = """
@@ -65,6 +69,10 @@ class VetKnowledgeGraphBuilder:
             self._process_adverse_effects(session, drug_data)
             self._process_dosages(session, drug_data)
 
+        # Materialized answers of this drug are stale until the next materialization
+        if self.answer_store is not None:
+            self.answer_store.invalidate(drug_data['Medicine Name'])
+
     def _process_uses(self, session, drug_data: Dict[str, Any]):
         """Process uses/indications and create relationships."""
         uses = drug_data.get('Uses/Indications', '')
@@ -192,8 +200,15 @@ def main():
     neo4j_user = "neo4j"
     neo4j_password = "your_password"
 
+    # Open the materialized answers, if enabled, so rebuilt drugs are invalidated
+    with open('../config.yaml', 'r') as f:
+        answers_config = yaml.safe_load(f).get('answers', {})
+    answer_store = None
+    if answers_config.get('enabled', False):
+        answer_store = AnswerStore(answers_config['artifact_path'])
+
     # Initialize builder
-    builder = VetKnowledgeGraphBuilder(neo4j_uri, neo4j_user, neo4j_password)
+    builder = VetKnowledgeGraphBuilder(neo4j_uri, neo4j_user, neo4j_password, answer_store)
 
     try:
         # Create constraints
@@ -213,6 +228,8 @@ def main():
 
     finally:
         builder.close()
+        if answer_store is not None:
+            answer_store.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,104 @@
+from graph_connection import GraphConnection
+from answer_store import AnswerStore, profile_fingerprint
+from responses import INTENTS, PROFILE_QUERY, generate_response, profile_to_kg_info
+from typing import Any, Dict, Iterator, List
+import logging
+import random
+import time
+import yaml
+
+class AnswerMaterializer:
+    """Render the chatbot's answer for every drug × intent into an `AnswerStore`."""
+
+    def __init__(self, config_path="../config.yaml", batch_size: int = 500):
+        self.load_config(config_path)
+        self.setup_logging()
+        self.graph = GraphConnection(self.config['neo4j'])
+        self.store = AnswerStore(self.config['answers']['artifact_path'])
+        self.batch_size = batch_size
+
+    def load_config(self, config_path):
+        """Load configuration from yaml file."""
+        with open(config_path, 'r') as f:
+            self.config = yaml.safe_load(f)
+
+    def setup_logging(self):
+        """Set up logging configuration."""
+        logging.basicConfig(
+            level=self.config['logging']['level'],
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.FileHandler(self.config['logging']['file']),
+                logging.StreamHandler()
+            ]
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def read_profiles(self) -> Iterator[Dict[str, Any]]:
+        """Stream the profile of every drug in the graph."""
+        with self.graph.session() as session:
+            for record in session.run("MATCH (d:Drug)" + PROFILE_QUERY):
+                yield dict(record)
+
+    def render_answers(self, profile: Dict[str, Any]) -> Dict[str, str]:
+        """Render the answer to every intent from a drug profile."""
+        return {intent: generate_response(intent, profile_to_kg_info(intent, profile)) for intent in INTENTS}
+
+    def materialize(self) -> Dict[str, int]:
+        """Render answers for drugs that are new or changed since they were last materialized."""
+        rendered = unchanged = 0
+        batch: List[tuple] = []
+        for profile in self.read_profiles():
+            fingerprint = profile_fingerprint(profile)
+            if self.store.fingerprint(profile['name']) == fingerprint:
+                unchanged += 1
+                continue
+            batch.append((profile['name'], fingerprint, self.render_answers(profile)))
+            if len(batch) >= self.batch_size:
+                self.store.put_many(batch)
+                rendered += len(batch)
+                batch = []
+        if batch:
+            self.store.put_many(batch)
+            rendered += len(batch)
+        self.logger.info(f"Materialized answers for {rendered} drugs, {unchanged} unchanged")
+        return {'rendered': rendered, 'unchanged': unchanged}
+
+    def report(self, samples: int = 1000) -> Dict[str, Any]:
+        """Report the artifact size and the latency of random lookups."""
+        stats = self.store.stats()
+        drugs = self.store.drugs()
+        latencies = []
+        if drugs:
+            rng = random.Random(0)
+            for _ in range(samples):
+                drug, intent = rng.choice(drugs), rng.choice(INTENTS)
+                start = time.perf_counter()
+                self.store.get(drug, intent)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            stats['lookup_p50_us'] = round(latencies[len(latencies) // 2] * 1e6, 2)
+            stats['lookup_p99_us'] = round(latencies[int(len(latencies) * 0.99)] * 1e6, 2)
+        return stats
+
+    def close(self):
+        """Close the Neo4j driver and the answer store."""
+        self.graph.close()
+        self.store.close()
+
+def main():
+    materializer = AnswerMaterializer()
+    try:
+        materializer.materialize()
+        materializer.store.compact()
+        stats = materializer.report()
+        print(f"Drugs: {stats['drugs']}, answers: {stats['entries']}")
+        print(f"Artifact size: {stats['artifact_bytes'] / 1024:.1f} KiB "
+              f"({stats['answer_bytes'] / 1024:.1f} KiB of compressed answers)")
+        if 'lookup_p50_us' in stats:
+            print(f"Lookup latency: p50 {stats['lookup_p50_us']} us, p99 {stats['lookup_p99_us']} us")
+    finally:
+        materializer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, spanning a regex match up to a slow Neo4j round-trip.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram whose memory use does not grow with the number of observations."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _StageTimer:
+    """Context manager timing one stage into a histogram."""
+
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Tuple[Tuple[str, str], ...]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+class _NullTimer:
+    """Stand-in for `_StageTimer` when metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Set the HELP line shown for a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: Tuple[Tuple[str, str], ...] = (), amount: float = 1):
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Tuple[Tuple[str, str], ...] = ()):
+        """Record a value in a histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def time(self, name: str, labels: Tuple[Tuple[str, str], ...] = ()):
+        """Return a context manager recording its duration in a histogram."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name, labels)
+
+    def stage(self, stage: str):
+        """Time one stage of query processing."""
+        return self.time('vet_chatbot_stage_seconds', (('stage', stage),))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._render_header(lines, name, 'counter')
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for name in sorted(self._histograms):
+                self._render_header(lines, name, 'histogram')
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else _format_value(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _render_header(self, lines: List[str], name: str, metric_type: str):
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _ProfiledRequest:
+    """Context manager collecting stack samples for the current thread while it runs."""
+
+    __slots__ = ('profiler', 'label', 'thread_id', 'start')
+
+    def __init__(self, profiler: 'SamplingProfiler', label: str):
+        self.profiler = profiler
+        self.label = label
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.profiler._register(self.thread_id)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        samples = self.profiler._unregister(self.thread_id)
+        duration = time.perf_counter() - self.start
+        if duration >= self.profiler.threshold and samples:
+            self.profiler._dump(self.label, duration, samples)
+        return False
+
+
+class SamplingProfiler:
+    """Samples the stacks of in-flight requests and dumps those of slow ones as collapsed stacks.
+
+    The output file uses the folded format (`frame;frame;frame count`) understood by
+    flamegraph.pl and speedscope, with one comment line per slow request.
+    """
+
+    def __init__(self, enabled: bool = False, threshold_ms: float = 500, interval_ms: float = 5,
+                 output_file: str = '../logs/slow_requests.folded', max_depth: int = 64):
+        self.enabled = enabled
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.output_file = output_file
+        self.max_depth = max_depth
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def profile(self, label: str = ''):
+        """Return a context manager that profiles the enclosed request when enabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        self._ensure_started()
+        return _ProfiledRequest(self, label)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='vet-chatbot-profiler', daemon=True)
+                    self._thread.start()
+
+    def _register(self, thread_id: int):
+        with self._lock:
+            self._active[thread_id] = Counter()
+
+    def _unregister(self, thread_id: int) -> Counter:
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._collapse(frame)] += 1
+
+    def _collapse(self, frame) -> str:
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+    def _dump(self, label: str, duration: float, samples: Counter):
+        label = " ".join(label.split())
+        lines = [f"# {time.strftime('%Y-%m-%d %H:%M:%S')} {duration * 1000:.1f}ms {label}"]
+        lines.extend(f"{stack} {count}" for stack, count in samples.most_common())
+        with self._dump_lock:
+            with open(self.output_file, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+
+
+def create_metrics(config: Dict[str, Any]) -> Tuple[MetricsRegistry, SamplingProfiler]:
+    """Create the metrics registry and profiler described by the `metrics` section of the config."""
+    registry = MetricsRegistry(
+        enabled=config.get('enabled', True),
+        buckets=config.get('buckets', DEFAULT_BUCKETS)
+    )
+    registry.describe('vet_chatbot_stage_seconds', 'Time spent in each stage of process_query.')
+    registry.describe('vet_chatbot_queries_total', 'Processed queries by detected intent.')
+    registry.describe('vet_chatbot_cache_requests_total', 'Cache lookups by cache and result.')
+    registry.describe('vet_chatbot_errors_total', 'Queries that failed with an exception.')
+
+    profiling = config.get('profiling', {})
+    profiler = SamplingProfiler(
+        enabled=profiling.get('enabled', False),
+        threshold_ms=profiling.get('slow_threshold_ms', 500),
+        interval_ms=profiling.get('interval_ms', 5),
+        output_file=profiling.get('output_file', '../logs/slow_requests.folded')
+    )
+    return registry, profiler
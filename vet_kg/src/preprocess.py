@@ -37,28 +37,30 @@ class DrugDataPreprocessor:
         try:
             # Convert string representation of dictionary to actual dictionary
             drug_dict = eval(entry)
-            
-            # Clean and structure the data
-            cleaned_dict = {}
-            for key, value in drug_dict.items():
-                # Clean the value
-                cleaned_value = self._clean_text(value)
-                
-                # Extract entities if needed
-                if key == 'Uses/Indications':
-                    cleaned_dict[key] = cleaned_value
-                    cleaned_dict['extracted_conditions'] = self._extract_medical_entities(cleaned_value)
-                elif key == 'Adverse Effects':
-                    cleaned_dict[key] = cleaned_value
-                    cleaned_dict['extracted_effects'] = self._extract_medical_entities(cleaned_value)
-                else:
-                    cleaned_dict[key] = cleaned_value
-                    
-            return cleaned_dict
+            return self.process_record(drug_dict)
             
         except Exception as e:
             print(f"Error processing entry: {e}")
             return None
+
+    def process_record(self, drug_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Clean a drug record and extract medical entities from its text fields."""
+        cleaned_dict = {}
+        for key, value in drug_dict.items():
+            # Clean the value
+            cleaned_value = self._clean_text(value)
+            
+            # Extract entities if needed
+            if key == 'Uses/Indications':
+                cleaned_dict[key] = cleaned_value
+                cleaned_dict['extracted_conditions'] = self._extract_medical_entities(cleaned_value)
+            elif key == 'Adverse Effects':
+                cleaned_dict[key] = cleaned_value
+                cleaned_dict['extracted_effects'] = self._extract_medical_entities(cleaned_value)
+            else:
+                cleaned_dict[key] = cleaned_value
+                
+        return cleaned_dict
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text content."""
@@ -0,0 +1,112 @@
+from typing import Any, Dict
+
+INTENT_PATTERNS = {
+    'usage': r'(how|what|when).*(use|give|administer|dose|dosage)',
+    'side_effects': r'(side effects|adverse|reactions|problems)',
+    'contraindications': r'(contraindications|warnings|cautions|avoid)',
+    'interactions': r'(interact|combination|mixed|together)',
+    'storage': r'(store|storage|keep|stability)',
+}
+
+# Every intent the chatbot answers: the detected ones plus the fallback.
+INTENTS = tuple(INTENT_PATTERNS) + ('general',)
+
+NOT_FOUND_RESPONSE = "I'm sorry, I couldn't find information about that drug. Could you please verify the drug name?"
+
+# Reads every field needed to answer any intent about the drugs bound to `d`.
+PROFILE_QUERY = """
+    OPTIONAL MATCH (d)-[:HAS_DOSAGE]->(dos:Dosage)
+    WITH d, head(collect(dos.description)) as dosage
+    OPTIONAL MATCH (d)-[:HAS_SIDE_EFFECT]->(e:Effect)
+    WITH d, dosage, collect(e.name) as specific_effects
+    OPTIONAL MATCH (d)-[:CONTRAINDICATED_FOR]->(c:Contraindication)
+    WITH d, dosage, specific_effects, collect(c.name) as specific_contraindications
+    OPTIONAL MATCH (d)-[:INTERACTS_WITH]-(d2:Drug)
+    RETURN d.name as name, d.uses as uses, dosage, d.adverse_effects as effects, specific_effects,
+           d.contraindications as warnings, specific_contraindications,
+           collect(d2.name) as interacting_drugs, d.storage as storage,
+           properties(d) as properties
+"""
+
+# Maps each intent to the profile fields its response is formatted from.
+PROFILE_FIELDS = {
+    'usage': ('uses', 'dosage'),
+    'side_effects': ('effects', 'specific_effects'),
+    'contraindications': ('warnings', 'specific_contraindications'),
+    'interactions': ('interacting_drugs',),
+    'storage': ('storage',),
+}
+
+
+def profile_to_kg_info(intent: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Select the fields of a drug profile that the intent's response uses."""
+    if not profile:
+        return {}
+    if intent in PROFILE_FIELDS:
+        return {field: profile.get(field) for field in PROFILE_FIELDS[intent]}
+    return {'d': profile.get('properties')}
+
+
+def generate_response(intent: str, kg_info: Dict[str, Any]) -> str:
+    """Generate natural language response based on intent and knowledge graph information."""
+    if not kg_info:
+        return NOT_FOUND_RESPONSE
+
+    if intent == 'usage':
+        return format_usage_response(kg_info)
+    elif intent == 'side_effects':
+        return format_side_effects_response(kg_info)
+    elif intent == 'contraindications':
+        return format_contraindications_response(kg_info)
+    elif intent == 'interactions':
+        return format_interactions_response(kg_info)
+    elif intent == 'storage':
+        return format_storage_response(kg_info)
+    else:
+        return format_general_response(kg_info)
+
+
+def format_usage_response(info):
+    """Format usage information response."""
+    response = []
+    if info.get('uses'):
+        response.append(f"Usage Information:\n{info['uses']}")
+    if info.get('dosage'):
+        response.append(f"\nDosage Instructions:\n{info['dosage']}")
+    return "\n".join(response) if response else "I couldn't find specific usage information for this drug."
+
+
+def format_side_effects_response(info):
+    """Format side effects information response."""
+    if info.get('effects'):
+        return f"Potential side effects:\n{info['effects']}"
+    return "I couldn't find specific side effect information for this drug."
+
+
+def format_contraindications_response(info):
+    """Format contraindications information response."""
+    if info.get('warnings'):
+        return f"Important warnings and contraindications:\n{info['warnings']}"
+    return "I couldn't find specific contraindication information for this drug."
+
+
+def format_interactions_response(info):
+    """Format drug interactions information response."""
+    if info.get('interacting_drugs'):
+        drugs = ", ".join(info['interacting_drugs'])
+        return f"This drug may interact with: {drugs}"
+    return "No specific drug interaction information found."
+
+
+def format_storage_response(info):
+    """Format storage information response."""
+    if info.get('storage'):
+        return f"Storage instructions:\n{info['storage']}"
+    return "I couldn't find specific storage information for this drug."
+
+
+def format_general_response(info):
+    """Format general drug information response."""
+    if info:
+        return f"Here's what I know about this drug:\n{info}"
+    return "I couldn't find general information about this drug."
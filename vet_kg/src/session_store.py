@@ -0,0 +1,235 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class SessionState:
+    """Conversation context remembered between queries of one chat session."""
+
+    __slots__ = ('drugs', 'species', 'intent', 'profile', 'accessed_at', 'size')
+
+    def __init__(self, drugs: Tuple[str, ...] = (), species: Tuple[str, ...] = (),
+                 intent: str = 'general', profile: Optional[Dict[str, Any]] = None):
+        self.drugs = tuple(drugs)
+        self.species = tuple(species)
+        self.intent = intent
+        self.profile = profile
+        self.accessed_at = time.monotonic()
+        self.size = _estimate_size(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable representation of the state."""
+        return {
+            'drugs': list(self.drugs),
+            'species': list(self.species),
+            'intent': self.intent,
+            'profile': self.profile,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionState':
+        """Rebuild a state from the output of `to_dict`."""
+        return cls(data.get('drugs', ()), data.get('species', ()),
+                   data.get('intent', 'general'), data.get('profile'))
+
+
+def _estimate_size(value: Any) -> int:
+    """Roughly estimate the memory held by a session state in bytes."""
+    if isinstance(value, SessionState):
+        return (sys.getsizeof(value) + _estimate_size(value.drugs) + _estimate_size(value.species)
+                + sys.getsizeof(value.intent) + _estimate_size(value.profile))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class InMemorySessionStore:
+    """Process-local session store with LRU eviction, TTL and a memory cap."""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800, max_bytes: int = 16 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sessions: 'OrderedDict[str, SessionState]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Return the state of a session, or None if unknown or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            state.accessed_at = now
+            self._sessions.move_to_end(session_id)
+            return state
+
+    def put(self, session_id: str, state: SessionState):
+        """Store the state of a session, evicting the least recently used ones if needed."""
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            if state.size > self.max_bytes:
+                return
+            state.accessed_at = time.monotonic()
+            self._sessions[session_id] = state
+            self._bytes += state.size
+            self._evict()
+
+    def delete(self, session_id: str):
+        """Forget a session."""
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sessions)
+
+    @property
+    def memory_usage(self) -> int:
+        """Estimated number of bytes held by stored sessions."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._bytes
+
+    def close(self):
+        """Drop every session."""
+        with self._lock:
+            self._sessions.clear()
+            self._bytes = 0
+
+    def _remove(self, session_id: str):
+        state = self._sessions.pop(session_id)
+        self._bytes -= state.size
+
+    def _expire(self, now: float):
+        # Sessions are kept in access order, so the expired ones are always at the head
+        cutoff = now - self.ttl_seconds
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if oldest.accessed_at >= cutoff:
+                break
+            self._remove(oldest_id)
+
+    def _evict(self):
+        self._expire(time.monotonic())
+        while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._sessions)))
+
+
+class SQLiteSessionStore:
+    """Session store backed by a local SQLite file, shared by all worker processes on a host."""
+
+    def __init__(self, path: str, max_sessions: int = 1000, ttl_seconds: float = 1800,
+                 max_bytes: int = 16 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_accessed_at ON sessions (accessed_at)")
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Return the state of a session, or None if unknown or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, accessed_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                return None
+            self._conn.execute("UPDATE sessions SET accessed_at = ? WHERE session_id = ?", (now, session_id))
+        return SessionState.from_dict(json.loads(row[0]))
+
+    def put(self, session_id: str, state: SessionState):
+        """Store the state of a session, evicting the least recently used ones if needed."""
+        payload = json.dumps(state.to_dict(), separators=(',', ':'))
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, payload, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (session_id, payload, size, now)
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str):
+        """Forget a session."""
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+    @property
+    def memory_usage(self) -> int:
+        """Number of payload bytes held by stored sessions."""
+        with self._lock:
+            return self._conn.execute("SELECT coalesce(sum(size), 0) FROM sessions").fetchone()[0]
+
+    def close(self):
+        """Close the SQLite connection."""
+        self._conn.close()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM sessions WHERE accessed_at < ?", (now - self.ttl_seconds,))
+        self._conn.execute("""
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM sessions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_sessions,))
+        self._conn.execute("""
+            DELETE FROM sessions WHERE session_id IN (
+                SELECT session_id FROM (
+                    SELECT session_id, sum(size) OVER (ORDER BY accessed_at DESC) AS running
+                    FROM sessions
+                ) WHERE running > ?
+            )
+        """, (self.max_bytes,))
+
+
+def create_session_store(config: Dict[str, Any]):
+    """Create the session store described by the `sessions` section of the config."""
+    backend = config.get('backend', 'memory')
+    limits = {
+        'max_sessions': config.get('max_sessions', 1000),
+        'ttl_seconds': config.get('ttl_seconds', 1800),
+        'max_bytes': config.get('max_bytes', 16 * 1024 * 1024),
+    }
+    if backend == 'memory':
+        return InMemorySessionStore(**limits)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(config.get('sqlite_path', '../data/sessions.db'), **limits)
+    raise ValueError(f"Unknown session store backend: {backend}")
@@ -1,11 +1,23 @@
-from neo4j import GraphDatabase
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import spacy
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import logging
 import yaml
 import re
+import time
+from session_store import SessionState, create_session_store
+from metrics import create_metrics
+from graph_connection import GraphConnection
+from answer_store import AnswerStore, normalize_drug_name
+from responses import INTENT_PATTERNS, PROFILE_QUERY, generate_response, profile_to_kg_info
+from embeddings import create_embedding_service
+
+SPECIES_PATTERN = re.compile(
+    r'\b(dogs?|cats?|horses?|cattle|cows?|pigs?|sheep|goats?|birds?|rabbits?|ferrets?|canine|feline|equine)\b'
+)
+
+# Words of a query that may form a drug name, e.g. "carpromycin-12 maleate"
+DRUG_WORD_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-]*")
 
 class VetPharmacyBot:
     def __init__(self, config_path: str = "../config.yaml"):
@@ -14,6 +26,11 @@ class VetPharmacyBot:
         self.setup_logging()
         self.setup_models()
         self.connect_to_neo4j()
+        self.sessions = create_session_store(self.config.get('sessions', {}))
+        self.metrics, self.profiler = create_metrics(self.config.get('metrics', {}))
+        self.setup_answer_store()
+        self.drug_names_refresh_seconds = self.config.get('sessions', {}).get('drug_names_refresh_seconds', 300)
+        self.load_drug_names()
 
     def load_config(self, config_path: str):
         """Load configuration from yaml file."""
@@ -35,48 +52,158 @@ class VetPharmacyBot:
     def setup_models(self):
         """Initialize NLP models."""
         self.nlp = spacy.load("en_core_web_sm")
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # Imported here, so the chatbot's routing can be exercised without the model installed
+        from sentence_transformers import SentenceTransformer
+        self.encoder = SentenceTransformer(self.config['models']['sentence_transformer'])
+        self.embeddings = create_embedding_service(self.config.get('embeddings', {}), self.encoder)
         
     def connect_to_neo4j(self):
         """Connect to Neo4j database."""
-        neo4j_config = self.config['neo4j']
-        self.driver = GraphDatabase.driver(
-            neo4j_config['uri'],
-            auth=(neo4j_config['user'], neo4j_config['password'])
-        )
+        self.graph = GraphConnection(self.config['neo4j'])
+        self.driver = self.graph.driver
+
+    def setup_answer_store(self):
+        """Open the materialized answers, if enabled."""
+        answers_config = self.config.get('answers', {})
+        self.answers = None
+        if answers_config.get('enabled', False):
+            self.answers = AnswerStore(answers_config['artifact_path'])
 
-    def process_query(self, user_query: str) -> str:
+    def load_drug_names(self):
+        """Index the drug names in the graph, so queries naming a drug are recognised without spaCy."""
+        drug_names: Dict[str, str] = {}
+        try:
+            names = self.graph.read(self._read_drug_names)
+        except Exception as e:
+            self.logger.warning(f"Could not load drug names: {str(e)}")
+            names = []
+        for name in names:
+            key = normalize_drug_name(name)
+            drug_names[key] = name
+            # "carpromycin-12" also names "CARPROMYCIN-12 MALEATE"
+            drug_names.setdefault(key.split()[0], name)
+        self.drug_names = drug_names
+        self.max_drug_name_words = max((len(key.split()) for key in drug_names), default=1)
+        self.drug_names_loaded_at = time.monotonic()
+
+    def _read_drug_names(self, tx) -> List[str]:
+        """Read the name of every drug within a transaction."""
+        return [record['name'] for record in tx.run("MATCH (d:Drug) RETURN d.name as name") if record['name']]
+
+    def process_query(self, user_query: str, session_id: Optional[str] = None) -> str:
         """Process user query and generate response."""
-        # Extract intent and entities
-        intent, entities = self._analyze_query(user_query)
-        
-        # Get relevant information from knowledge graph
-        kg_info = self._query_knowledge_graph(intent, entities)
-        
-        # Generate response
-        response = self._generate_response(intent, entities, kg_info)
-        
-        return response
+        with self.profiler.profile(user_query[:80]), self.metrics.stage('total'):
+            with self.metrics.stage('session_lookup'):
+                session = self.sessions.get(session_id) if session_id else None
+
+            # Queries naming no known drug are follow-ups about the session's drug, answered without spaCy
+            if session is not None and session.drugs:
+                with self.metrics.stage('drug_match'):
+                    named_drugs = self._match_drug_names(user_query)
+                if not named_drugs:
+                    self.metrics.inc('vet_chatbot_cache_requests_total', (('cache', 'session'), ('result', 'hit')))
+                    return self._answer_follow_up(session_id, session, user_query)
+            if session_id:
+                self.metrics.inc('vet_chatbot_cache_requests_total', (('cache', 'session'), ('result', 'miss')))
+
+            # Extract intent and entities
+            with self.metrics.stage('analyze'):
+                intent, entities = self._analyze_query(user_query)
+            self.metrics.inc('vet_chatbot_queries_total', (('intent', intent),))
+
+            # Materialized answers skip the graph and formatting entirely
+            if entities['drugs']:
+                answer = self._lookup_answer(entities['drugs'][0], intent)
+                if answer is not None:
+                    if session_id:
+                        species = tuple(entities['animals']) or self._extract_species(user_query)
+                        self.sessions.put(session_id, SessionState(entities['drugs'], species, intent))
+                    return answer
+
+            # Get relevant information from knowledge graph
+            with self.metrics.stage('knowledge_graph'):
+                if session_id and entities['drugs']:
+                    profile = self._query_profile(entities['drugs'][0])
+                    kg_info = profile_to_kg_info(intent, profile)
+                    if profile:
+                        species = tuple(entities['animals']) or self._extract_species(user_query)
+                        self.sessions.put(session_id, SessionState(entities['drugs'], species, intent, profile))
+                else:
+                    kg_info = self._query_knowledge_graph(intent, entities)
+
+            # Generate response
+            with self.metrics.stage('format'):
+                response = generate_response(intent, kg_info)
+
+            return response
+
+    def _answer_follow_up(self, session_id: str, session: SessionState, query: str) -> str:
+        """Answer a follow-up question from the session context without NLP access."""
+        with self.metrics.stage('follow_up'):
+            intent = self._detect_intent(query) or session.intent
+            species = self._extract_species(query) or session.species
+        self.metrics.inc('vet_chatbot_queries_total', (('intent', intent),))
+
+        answer = self._lookup_answer(session.drugs[0], intent)
+        profile = session.profile
+        if answer is None:
+            # Only reached when the answer is not materialized and no profile was cached
+            if profile is None:
+                with self.metrics.stage('knowledge_graph'):
+                    profile = self._query_profile(session.drugs[0])
+            with self.metrics.stage('format'):
+                answer = generate_response(intent, profile_to_kg_info(intent, profile))
+
+        self.sessions.put(session_id, SessionState(session.drugs, species, intent, profile))
+        return answer
+
+    def _match_drug_names(self, query: str) -> List[str]:
+        """Return the known drugs named in the query, matching the longest names first."""
+        if time.monotonic() - self.drug_names_loaded_at > self.drug_names_refresh_seconds:
+            self.load_drug_names()
+        drug_names = self.drug_names
+        words = [word.upper() for word in DRUG_WORD_PATTERN.findall(query)]
+        found = []
+        i = 0
+        while i < len(words):
+            for length in range(min(self.max_drug_name_words, len(words) - i), 0, -1):
+                name = drug_names.get(' '.join(words[i:i + length]))
+                if name is not None:
+                    found.append(name)
+                    i += length
+                    break
+            else:
+                i += 1
+        return list(dict.fromkeys(found))
+
+    def _lookup_answer(self, drug_name: str, intent: str) -> Optional[str]:
+        """Return the materialized answer for a drug and intent, if any."""
+        if self.answers is None:
+            return None
+        with self.metrics.stage('answer_lookup'):
+            answer = self.answers.get(drug_name, intent)
+        result = 'miss' if answer is None else 'hit'
+        self.metrics.inc('vet_chatbot_cache_requests_total', (('cache', 'answers'), ('result', result)))
+        return answer
+
+    def _detect_intent(self, query: str) -> Optional[str]:
+        """Return the intent matched by the query, or None if no pattern matches."""
+        query = query.lower()
+        for intent_name, pattern in INTENT_PATTERNS.items():
+            if re.search(pattern, query):
+                return intent_name
+        return None
+
+    def _extract_species(self, query: str) -> tuple:
+        """Extract animal species mentioned in the query."""
+        return tuple(dict.fromkeys(SPECIES_PATTERN.findall(query.lower())))
 
     def _analyze_query(self, query: str) -> tuple:
         """Analyze user query to extract intent and entities."""
         doc = self.nlp(query.lower())
         
-        # Define intent patterns
-        intent_patterns = {
-            'usage': r'(how|what|when).*(use|give|administer|dose|dosage)',
-            'side_effects': r'(side effects|adverse|reactions|problems)',
-            'contraindications': r'(contraindications|warnings|cautions|avoid)',
-            'interactions': r'(interact|combination|mixed|together)',
-            'storage': r'(store|storage|keep|stability)',
-        }
-        
         # Determine intent
-        intent = 'general'
-        for intent_name, pattern in intent_patterns.items():
-            if re.search(pattern, query.lower()):
-                intent = intent_name
-                break
+        intent = self._detect_intent(query) or 'general'
         
         # Extract entities (drug names, animal types, symptoms)
         entities = {
@@ -87,34 +214,37 @@ class VetPharmacyBot:
         
         for ent in doc.ents:
             if ent.label_ in ['CHEMICAL', 'PRODUCT']:
-                entities['drugs'].append(ent.text)
+                # The query was lowercased for spaCy; drug nodes are named as in the formulary
+                key = normalize_drug_name(ent.text)
+                entities['drugs'].append(self.drug_names.get(key, key))
             elif ent.label_ in ['ANIMAL']:
                 entities['animals'].append(ent.text)
             elif ent.label_ in ['DISEASE', 'SYMPTOM']:
                 entities['symptoms'].append(ent.text)
-        
+
+        # Known drug names that spaCy did not tag
+        if not entities['drugs']:
+            entities['drugs'] = self._match_drug_names(query)
+
         return intent, entities
 
     def _query_knowledge_graph(self, intent: str, entities: Dict[str, List[str]]) -> Dict[str, Any]:
         """Query Neo4j knowledge graph based on intent and entities."""
-        with self.driver.session() as session:
-            if intent == 'usage':
-                return self._query_usage(session, entities)
-            elif intent == 'side_effects':
-                return self._query_side_effects(session, entities)
-            elif intent == 'contraindications':
-                return self._query_contraindications(session, entities)
-            elif intent == 'interactions':
-                return self._query_interactions(session, entities)
-            elif intent == 'storage':
-                return self._query_storage(session, entities)
-            else:
-                return self._query_general(session, entities)
+        if not entities['drugs']:
+            return {}
+        query_functions = {
+            'usage': self._query_usage,
+            'side_effects': self._query_side_effects,
+            'contraindications': self._query_contraindications,
+            'interactions': self._query_interactions,
+            'storage': self._query_storage,
+        }
+        return self.graph.read(query_functions.get(intent, self._query_general), entities)
 
-    def _query_usage(self, session, entities):
+    def _query_usage(self, tx, entities):
         """Query usage information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d:Drug {name: $drug_name})
                 OPTIONAL MATCH (d)-[:HAS_DOSAGE]->(dos:Dosage)
                 RETURN d.uses as uses, dos.description as dosage
@@ -122,10 +252,10 @@ class VetPharmacyBot:
             return result.single()
         return {}
 
-    def _query_side_effects(self, session, entities):
+    def _query_side_effects(self, tx, entities):
         """Query side effects information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d:Drug {name: $drug_name})
                 OPTIONAL MATCH (d)-[:HAS_SIDE_EFFECT]->(e:Effect)
                 RETURN d.adverse_effects as effects, collect(e.name) as specific_effects
@@ -133,10 +263,10 @@ class VetPharmacyBot:
             return result.single()
         return {}
 
-    def _query_contraindications(self, session, entities):
+    def _query_contraindications(self, tx, entities):
         """Query contraindications information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d:Drug {name: $drug_name})
                 OPTIONAL MATCH (d)-[:CONTRAINDICATED_FOR]->(c:Contraindication)
                 RETURN d.contraindications as warnings, collect(c.name) as specific_contraindications
@@ -144,10 +274,10 @@ class VetPharmacyBot:
             return result.single()
         return {}
 
-    def _query_interactions(self, session, entities):
+    def _query_interactions(self, tx, entities):
         """Query drug interactions information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d1:Drug {name: $drug_name})
                 OPTIONAL MATCH (d1)-[r:INTERACTS_WITH]-(d2:Drug)
                 RETURN collect(d2.name) as interacting_drugs
@@ -155,87 +285,43 @@ class VetPharmacyBot:
             return result.single()
         return {}
 
-    def _query_storage(self, session, entities):
+    def _query_storage(self, tx, entities):
         """Query storage information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d:Drug {name: $drug_name})
                 RETURN d.storage as storage
                 """, drug_name=entities['drugs'][0])
             return result.single()
         return {}
 
-    def _query_general(self, session, entities):
+    def _query_general(self, tx, entities):
         """Query general drug information."""
         if entities['drugs']:
-            result = session.run("""
+            result = tx.run("""
                 MATCH (d:Drug {name: $drug_name})
                 RETURN d
                 """, drug_name=entities['drugs'][0])
             return result.single()
         return {}
 
-    def _generate_response(self, intent: str, entities: Dict[str, List[str]], kg_info: Dict[str, Any]) -> str:
-        """Generate natural language response based on intent and knowledge graph information."""
-        if not kg_info:
-            return "I'm sorry, I couldn't find information about that drug. Could you please verify the drug name?"
-
-        if intent == 'usage':
-            return self._format_usage_response(kg_info)
-        elif intent == 'side_effects':
-            return self._format_side_effects_response(kg_info)
-        elif intent == 'contraindications':
-            return self._format_contraindications_response(kg_info)
-        elif intent == 'interactions':
-            return self._format_interactions_response(kg_info)
-        elif intent == 'storage':
-            return self._format_storage_response(kg_info)
-        else:
-            return self._format_general_response(kg_info)
-
-    def _format_usage_response(self, info):
-        """Format usage information response."""
-        response = []
-        if info.get('uses'):
-            response.append(f"Usage Information:\n{info['uses']}")
-        if info.get('dosage'):
-            response.append(f"\nDosage Instructions:\n{info['dosage']}")
-        return "\n".join(response) if response else "I couldn't find specific usage information for this drug."
-
-    def _format_side_effects_response(self, info):
-        """Format side effects information response."""
-        if info.get('effects'):
-            return f"Potential side effects:\n{info['effects']}"
-        return "I couldn't find specific side effect information for this drug."
-
-    def _format_contraindications_response(self, info):
-        """Format contraindications information response."""
-        if info.get('warnings'):
-            return f"Important warnings and contraindications:\n{info['warnings']}"
-        return "I couldn't find specific contraindication information for this drug."
-
-    def _format_interactions_response(self, info):
-        """Format drug interactions information response."""
-        if info.get('interacting_drugs'):
-            drugs = ", ".join(info['interacting_drugs'])
-            return f"This drug may interact with: {drugs}"
-        return "No specific drug interaction information found."
-
-    def _format_storage_response(self, info):
-        """Format storage information response."""
-        if info.get('storage'):
-            return f"Storage instructions:\n{info['storage']}"
-        return "I couldn't find specific storage information for this drug."
-
-    def _format_general_response(self, info):
-        """Format general drug information response."""
-        if info:
-            return f"Here's what I know about this drug:\n{info}"
-        return "I couldn't find general information about this drug."
+    def _query_profile(self, drug_name: str) -> Dict[str, Any]:
+        """Fetch every field needed to answer any intent about a drug in one round-trip."""
+        return self.graph.read(self._read_profile, drug_name)
+
+    def _read_profile(self, tx, drug_name: str) -> Dict[str, Any]:
+        """Read the full profile of a drug within a transaction."""
+        result = tx.run("MATCH (d:Drug {name: $drug_name})" + PROFILE_QUERY, drug_name=drug_name)
+        record = result.single()
+        return dict(record) if record else {}
 
     def close(self):
-        """Close the Neo4j driver connection."""
-        self.driver.close()
+        """Close the Neo4j driver, the embedding batcher, the session store and the answer store."""
+        self.embeddings.close()
+        self.graph.close()
+        self.sessions.close()
+        if self.answers is not None:
+            self.answers.close()
 
 def main():
     # Example usage
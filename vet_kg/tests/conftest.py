@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+# src/ for the modules under test, the project root for the `benchmarks` fakes
+for path in (SRC_DIR, ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,42 @@
+import pytest
+
+from answer_store import AnswerStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnswerStore(str(tmp_path / 'answers.db'))
+    yield store
+    store.close()
+
+
+def test_answers_are_keyed_by_normalized_drug_name(store):
+    store.put_many([('Acarbose  Maleate', 'f1', {'usage': 'Give with food', 'storage': 'Below 25C'})])
+    assert store.get('ACARBOSE MALEATE', 'usage') == 'Give with food'
+    assert store.get('acarbose maleate', 'storage') == 'Below 25C'
+    assert store.get('acarbose maleate', 'interactions') is None
+    assert store.fingerprint('acarbose maleate') == 'f1'
+    assert store.drugs() == ['ACARBOSE MALEATE']
+
+
+def test_put_many_replaces_every_answer_of_a_drug(store):
+    store.put_many([('ACARBOSE', 'f1', {'usage': 'old', 'storage': 'old'})])
+    store.put_many([('acarbose', 'f2', {'usage': 'new'})])
+    assert store.get('ACARBOSE', 'usage') == 'new'
+    assert store.get('ACARBOSE', 'storage') is None
+    assert store.fingerprint('ACARBOSE') == 'f2'
+
+
+def test_invalidate_drops_one_drug(store):
+    store.put_many([('ACARBOSE', 'f1', {'usage': 'a'}), ('INSULIN', 'f2', {'usage': 'b'})])
+    store.invalidate('acarbose')
+    assert store.get('ACARBOSE', 'usage') is None
+    assert store.fingerprint('ACARBOSE') is None
+    assert store.get('INSULIN', 'usage') == 'b'
+
+
+def test_clear_drops_every_drug(store):
+    store.put_many([('ACARBOSE', 'f1', {'usage': 'a'}), ('INSULIN', 'f2', {'usage': 'b'})])
+    store.clear()
+    assert store.drugs() == []
+    assert store.stats()['entries'] == 0
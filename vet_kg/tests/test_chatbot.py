@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+import graph_connection
+import vet_chatbot
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+from embeddings import HashingEncoder, create_embedding_service
+from responses import NOT_FOUND_RESPONSE
+
+
+class StubNLP:
+    """Tags the given words as PRODUCT entities and counts its calls, in place of spaCy."""
+
+    def __init__(self, products=()):
+        self.products = set(products)
+        self.calls = 0
+
+    def __call__(self, text: str):
+        self.calls += 1
+        words = [word.strip('?.,') for word in text.split()]
+        return SimpleNamespace(ents=[SimpleNamespace(text=word, label_='PRODUCT')
+                                     for word in words if word in self.products])
+
+
+def add_drug(graph: FakeGraph, name: str, **properties):
+    graph.run("MERGE (d:Drug {name: $name}) SET d += $properties", name=name, **properties)
+
+
+@pytest.fixture
+def graph():
+    graph = FakeGraph()
+    add_drug(graph, 'ACEMANNAN', uses='fibrosarcoma in dogs and cats', adverse_effects='salivation, weakness',
+             storage='store below 25C')
+    add_drug(graph, 'ACARBOSE MALEATE', uses='diabetes mellitus', adverse_effects='flatulence, soft stools',
+             storage='store in a dry place')
+    return graph
+
+
+@pytest.fixture
+def bot(graph, tmp_path, monkeypatch):
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'neo4j': {'uri': 'bolt://fake', 'user': 'neo4j', 'password': 'secret'},
+        'sessions': {'backend': 'memory'},
+        'answers': {'enabled': False},
+        'metrics': {'enabled': True},
+        'embeddings': {},
+    }))
+    # The chatbot logs to ../logs relative to where it runs
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'run').mkdir()
+    monkeypatch.chdir(tmp_path / 'run')
+
+    def setup_models(self):
+        self.nlp = StubNLP()
+        self.embeddings = create_embedding_service({}, HashingEncoder(16))
+
+    monkeypatch.setattr(vet_chatbot.VetPharmacyBot, 'setup_models', setup_models)
+    with patch_graph_database(graph, graph_connection):
+        bot = vet_chatbot.VetPharmacyBot(str(config_path))
+        yield bot
+        bot.close()
+
+
+def test_follow_ups_naming_no_drug_use_the_session_drug_without_spacy(bot):
+    assert 'salivation' in bot.process_query("What are the side effects of ACEMANNAN?", 's1')
+    calls = bot.nlp.calls
+
+    assert 'salivation' in bot.process_query("is it safe?", 's1')
+    assert 'fibrosarcoma' in bot.process_query("What is the dosage for dogs?", 's1')
+    assert bot.sessions.get('s1').species == ('dogs',)
+    assert bot.nlp.calls == calls
+
+
+def test_queries_naming_another_drug_switch_the_session_drug(bot):
+    bot.process_query("How should I store ACEMANNAN?", 's1')
+    assert 'dry place' in bot.process_query("And how do I store acarbose maleate?", 's1')
+    assert bot.sessions.get('s1').drugs == ('ACARBOSE MALEATE',)
+    # The first word of a name is enough to recognise the drug
+    assert 'salivation' not in bot.process_query("What are the side effects of acarbose?", 's1')
+
+
+def test_drug_names_tagged_by_spacy_are_matched_to_graph_names(bot):
+    bot.nlp.products = {'acemannan'}
+    assert 'salivation' in bot.process_query("What are the side effects of Acemannan?")
+    assert bot.process_query("What are the side effects of carprofen?") == NOT_FOUND_RESPONSE
+
+
+def test_drug_names_are_reloaded_from_the_graph(bot, graph):
+    bot.process_query("How should I store ACEMANNAN?", 's1')
+    add_drug(graph, 'INSULIN', storage='refrigerate')
+    assert 'below 25C' in bot.process_query("How should I store insulin?", 's1')
+    bot.drug_names_refresh_seconds = 0
+    assert 'refrigerate' in bot.process_query("How should I store insulin?", 's1')
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from embeddings import EmbeddingService, HashingEncoder, QuantizedVectorStore
+
+
+class GatedEncoder(HashingEncoder):
+    """Blocks every encode call until released, recording the batches it was given."""
+
+    def __init__(self, dim: int = 16):
+        super().__init__(dim)
+        self.batches = []
+        self.release = threading.Event()
+        self.error = None
+
+    def encode(self, sentences, **kwargs):
+        self.batches.append(list(sentences))
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return super().encode(sentences, **kwargs)
+
+
+def encode_concurrently(service, texts):
+    with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+        return list(executor.map(service.encode_query, texts))
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_concurrent_queries_are_encoded_in_one_batch():
+    encoder = GatedEncoder()
+    encoder.release.set()
+    service = EmbeddingService(encoder, max_batch_size=8, max_wait_ms=200)
+    texts = [f"dose of drug {n}" for n in range(8)]
+    vectors = encode_concurrently(service, texts)
+    service.close()
+
+    [batch] = encoder.batches
+    assert sorted(batch) == sorted(texts)
+    assert service.stats()['mean_batch_size'] == 8
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, encoder.encode([text], normalize_embeddings=True)[0], rtol=1e-6)
+        # Cached vectors are read-only copies, not views into the batch
+        assert not vector.flags.writeable
+        assert vector.base is None
+
+
+def test_cache_evicts_least_recently_used_queries():
+    encoder = GatedEncoder()
+    encoder.release.set()
+    service = EmbeddingService(encoder, max_wait_ms=0, cache_size=2)
+    for text in ('a', 'b', 'a', 'c'):
+        service.encode_query(text)
+    service.encode_query('a')
+    service.encode_query('b')
+    service.close()
+
+    assert encoder.batches == [['a'], ['b'], ['c'], ['b']]
+    assert service.stats()['cache_hits'] == 2
+    assert service.stats()['cached'] == 2
+
+
+def test_close_finishes_pending_queries():
+    encoder = GatedEncoder()
+    service = EmbeddingService(encoder, max_batch_size=2, max_wait_ms=5000)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(service.encode_query, f"query {n}") for n in range(4)]
+        # One batch of two is being encoded while the other two queries wait behind it
+        wait_for(lambda: len(encoder.batches) == 1 and len(service._pending) == 2)
+        closer = threading.Thread(target=service.close)
+        closer.start()
+        encoder.release.set()
+        closer.join(5)
+        results = [future.result(5) for future in futures]
+
+    assert not closer.is_alive()
+    assert all(vector.shape == (16,) for vector in results)
+    assert len(encoder.batches) == 2
+    with pytest.raises(RuntimeError):
+        service.encode_query('after close')
+
+
+def test_encoder_errors_reach_every_caller():
+    encoder = GatedEncoder()
+    encoder.error = ValueError("model failed")
+    service = EmbeddingService(encoder, max_batch_size=4, max_wait_ms=200)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(service.encode_query, f"query {n}") for n in range(4)]
+        wait_for(lambda: encoder.batches)
+        encoder.release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="model failed"):
+                future.result(5)
+    service.close()
+    assert service.stats()['cached'] == 0
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+def test_quantized_store_round_trips_through_save_and_load(dtype, tmp_path):
+    encoder = HashingEncoder(32)
+    texts = [f"drug {n} for dogs and cats" for n in range(50)]
+    vectors = encoder.encode(texts, normalize_embeddings=True)
+    store = QuantizedVectorStore(32, dtype)
+    store.add(texts, vectors)
+    store.save(str(tmp_path / 'store.npz'))
+    loaded = QuantizedVectorStore.load(str(tmp_path / 'store.npz'))
+
+    assert loaded.dtype == dtype
+    assert loaded.ids == texts
+    np.testing.assert_array_equal(loaded.codes, store.codes)
+    np.testing.assert_array_equal(loaded.scales, store.scales)
+    assert loaded.search(vectors[7], 1)[0][0] == texts[7]
+    exact = vectors @ vectors[7]
+    np.testing.assert_allclose(loaded.scores(vectors[7]), exact, atol=0.02)
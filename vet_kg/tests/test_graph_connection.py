@@ -0,0 +1,190 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import neo4j
+import pytest
+import yaml
+from neo4j import READ_ACCESS, WRITE_ACCESS
+
+import graph_connection
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+from graph_connection import POOL_DEFAULTS, GraphConnection
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
+
+NEO4J_CONFIG = {
+    'uri': 'bolt://localhost:7687',
+    'user': 'neo4j',
+    'password': 'secret',
+    'database': 'vetkg',
+    'fetch_size': 250,
+    'pool': {'max_connection_pool_size': 8, 'connection_acquisition_timeout': 5.0},
+}
+
+
+class RecordingTransaction:
+    def __init__(self, access_mode):
+        self.access_mode = access_mode
+
+
+class RecordingSession:
+    def __init__(self, **config):
+        self.config = config
+        self.calls = []
+        self.closed = False
+
+    def execute_read(self, work, *args, **kwargs):
+        self.calls.append('execute_read')
+        return work(RecordingTransaction(READ_ACCESS), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        self.calls.append('execute_write')
+        return work(RecordingTransaction(WRITE_ACCESS), *args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.closed = True
+        return False
+
+
+class RecordingDriver:
+    def __init__(self, uri, auth, config):
+        self.uri = uri
+        self.auth = auth
+        self.config = config
+        self.sessions = []
+        self.close_calls = 0
+        self._lock = threading.Lock()
+
+    def session(self, **config):
+        session = RecordingSession(**config)
+        with self._lock:
+            self.sessions.append(session)
+        return session
+
+    def close(self):
+        self.close_calls += 1
+
+
+class RecordingGraphDatabase:
+    """Stands in for `neo4j.GraphDatabase`, keeping the arguments of every driver it builds."""
+
+    def __init__(self):
+        self.drivers = []
+
+    def driver(self, uri, auth=None, **config):
+        driver = RecordingDriver(uri, auth, config)
+        self.drivers.append(driver)
+        return driver
+
+
+@pytest.fixture
+def database(monkeypatch):
+    fake = RecordingGraphDatabase()
+    monkeypatch.setattr(graph_connection, 'GraphDatabase', fake)
+    return fake
+
+
+def access_mode(tx):
+    return tx.access_mode
+
+
+def test_driver_receives_credentials_and_pool_settings(database):
+    GraphConnection(NEO4J_CONFIG)
+
+    [driver] = database.drivers
+    assert driver.uri == NEO4J_CONFIG['uri']
+    assert driver.auth == ('neo4j', 'secret')
+    assert driver.config == dict(POOL_DEFAULTS, max_connection_pool_size=8, connection_acquisition_timeout=5.0)
+
+
+def test_read_opens_read_session_on_configured_database(database):
+    connection = GraphConnection(NEO4J_CONFIG)
+
+    assert connection.read(access_mode) == READ_ACCESS
+
+    [session] = database.drivers[0].sessions
+    assert session.config == {'database': 'vetkg', 'default_access_mode': READ_ACCESS, 'fetch_size': 250}
+    assert session.calls == ['execute_read']
+    assert session.closed
+
+
+def test_write_opens_write_session(database):
+    connection = GraphConnection(NEO4J_CONFIG)
+
+    assert connection.write(access_mode) == WRITE_ACCESS
+
+    [session] = database.drivers[0].sessions
+    assert session.config['default_access_mode'] == WRITE_ACCESS
+    assert session.calls == ['execute_write']
+
+
+def test_database_and_fetch_size_default(database):
+    config = {key: NEO4J_CONFIG[key] for key in ('uri', 'user', 'password')}
+    connection = GraphConnection(config)
+    connection.read(access_mode)
+
+    assert database.drivers[0].config == POOL_DEFAULTS
+    assert database.drivers[0].sessions[0].config['database'] == 'neo4j'
+    assert database.drivers[0].sessions[0].config['fetch_size'] == 1000
+
+
+def test_concurrent_reads_share_one_driver(database):
+    connection = GraphConnection(NEO4J_CONFIG)
+
+    def read(n):
+        return connection.read(lambda tx, value: (tx.access_mode, value), n)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(read, range(800)))
+
+    assert results == [(READ_ACCESS, n) for n in range(800)]
+    [driver] = database.drivers
+    assert len(driver.sessions) == 800
+    assert all(session.closed for session in driver.sessions)
+    assert all(session.config['default_access_mode'] == READ_ACCESS for session in driver.sessions)
+
+
+def test_concurrent_reads_reuse_pooled_connections():
+    # Each read holds its connection for 1 ms, so the 16 threads contend for the 8 connections
+    graph = FakeGraph(latency=0.001)
+    graph.run("MERGE (d:Drug {name: $name}) SET d.storage = $storage", name='ACARBOSE', storage='Below 25C')
+    with patch_graph_database(graph, graph_connection) as database:
+        connection = GraphConnection(NEO4J_CONFIG)
+
+        def read(_):
+            return connection.read(
+                lambda tx: tx.run("MATCH (d:Drug {name: $drug_name}) RETURN d.storage as storage",
+                                  drug_name='ACARBOSE').single()['storage'])
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(read, range(400)))
+        connection.close()
+
+    assert results == ['Below 25C'] * 400
+    [driver] = database.drivers
+    pool = driver.pool
+    assert pool.created <= NEO4J_CONFIG['pool']['max_connection_pool_size']
+    assert pool.acquisitions == 400
+    assert pool.acquisitions >= 40 * pool.created
+    assert driver.closed
+
+
+def test_close_is_idempotent(database):
+    connection = GraphConnection(NEO4J_CONFIG)
+    connection.close()
+    connection.close()
+
+    assert database.drivers[0].close_calls == 1
+
+
+def test_neo4j_driver_accepts_configured_pool_settings():
+    # Drivers connect lazily, so this only checks config.yaml against the installed neo4j version
+    with open(CONFIG_PATH, 'r') as f:
+        neo4j_config = yaml.safe_load(f)['neo4j']
+    connection = GraphConnection(neo4j_config)
+    assert isinstance(connection.driver, neo4j.Driver)
+    connection.close()
@@ -0,0 +1,77 @@
+from ingest import parse_html, parse_text
+
+
+def test_html_unmapped_sections_end_the_previous_section():
+    record = parse_html(
+        "<h1>ACARBOSE</h1>"
+        "<p><b>Uses:</b> diabetes mellitus in cats</p>"
+        "<p><b>Pharmacology/Actions:</b> inhibits intestinal alpha-glucosidases</p>"
+        "<p><b>Overdosage/Acute Toxicity:</b> give fluids</p>"
+        "<h2>Storage/Stability</h2><p>Below 25C</p>"
+        "<dt>Drug Interactions</dt><dd>insulin</dd>"
+        "<h3>Client Information</h3><p>give with food</p>"
+    )
+    assert record == {
+        'Medicine Name': 'ACARBOSE',
+        'Uses/Indications': 'diabetes mellitus in cats',
+        'Storage/Stability': 'Below 25C',
+    }
+
+
+def test_html_species_labels_stay_in_their_section():
+    record = parse_html(
+        "<h1>ACARBOSE</h1><h2>Doses</h2>"
+        "<p><b>Dogs:</b> 12.5 mg PO</p><p><b>Cats:</b> 12.5 mg PO</p>"
+        "<h2><b>Storage</b></h2><p>Below 25C</p>"
+    )
+    assert record['Doses'] == 'Dogs: 12.5 mg PO Cats: 12.5 mg PO'
+    assert record['Storage/Stability'] == 'Below 25C'
+
+
+def test_text_unmapped_sections_end_the_previous_section():
+    record = parse_text(
+        "Medicine Name: ACARBOSE\n"
+        "Storage/Stability: Below 25C\n"
+        "Overdosage/Acute Toxicity: give fluids\n"
+        "Drug Interactions: insulin\n"
+        "Pharmacology/Actions\n"
+        "inhibits intestinal alpha-glucosidases\n"
+        "Doses\n"
+        "Dogs: 12.5 mg PO\n"
+        "Cats: 12.5 mg PO\n"
+    )
+    assert record == {
+        'Medicine Name': 'ACARBOSE',
+        'Storage/Stability': 'Below 25C',
+        'Doses': 'Dogs: 12.5 mg PO Cats: 12.5 mg PO',
+    }
+
+
+def test_text_unknown_labels_stay_in_their_section():
+    record = parse_text(
+        "Medicine Name: ACARBOSE\n"
+        "Doses\n"
+        "Dogs:\n"
+        "Diabetes mellitus: 12.5 mg PO\n"
+        "Storage: Below 25C\n"
+    )
+    assert record['Doses'] == 'Dogs: Diabetes mellitus: 12.5 mg PO'
+    assert record['Storage/Stability'] == 'Below 25C'
+
+
+def test_html_unknown_labels_stay_in_their_section():
+    record = parse_html(
+        "<h1>ACARBOSE</h1><h2>Doses</h2>"
+        "<h3>Dogs</h3><p><b>Diabetes mellitus:</b> 12.5 mg PO</p>"
+        "<h2>Storage</h2><p>Below 25C</p>"
+    )
+    assert record['Doses'] == 'Dogs Diabetes mellitus: 12.5 mg PO'
+    assert record['Storage/Stability'] == 'Below 25C'
+
+
+def test_html_inline_labels_do_not_cut_off_a_paragraph():
+    record = parse_html(
+        "<h1>ACARBOSE</h1>"
+        "<p><b>Uses:</b> diabetes mellitus in cats. <b>Important:</b> monitor blood glucose.</p>"
+    )
+    assert record['Uses/Indications'] == 'diabetes mellitus in cats. Important: monitor blood glucose.'
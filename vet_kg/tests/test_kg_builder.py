@@ -0,0 +1,35 @@
+import pytest
+
+import kg_builder
+from answer_store import AnswerStore
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    # The builder logs to vet_kg.log in the working directory
+    monkeypatch.chdir(tmp_path)
+    graph = FakeGraph()
+    with patch_graph_database(graph, kg_builder):
+        yield graph
+
+
+def test_drugs_are_stored_under_their_normalized_name(graph):
+    builder = kg_builder.VetKnowledgeGraphBuilder('bolt://fake', 'neo4j', 'secret')
+    builder.process_drug_data({'Medicine Name': 'Acarbose  maleate', 'Doses': 'Dogs: 12.5 mg PO'})
+    builder.close()
+    assert ('Drug', 'ACARBOSE MALEATE') in graph.nodes
+    assert graph.edges[('Drug', 'ACARBOSE MALEATE')]
+
+
+def test_processing_a_drug_invalidates_its_answers(graph, tmp_path):
+    store = AnswerStore(str(tmp_path / 'answers.db'))
+    store.put_many([('ACARBOSE', 'f1', {'usage': 'old'}), ('INSULIN', 'f2', {'usage': 'kept'})])
+    builder = kg_builder.VetKnowledgeGraphBuilder('bolt://fake', 'neo4j', 'secret', store)
+    builder.process_drug_data({'Medicine Name': 'Acarbose', 'Uses/Indications': 'diabetes mellitus'})
+    builder.close()
+
+    assert store.get('ACARBOSE', 'usage') is None
+    assert store.fingerprint('ACARBOSE') is None
+    assert store.get('INSULIN', 'usage') == 'kept'
+    store.close()
@@ -0,0 +1,45 @@
+import pytest
+import yaml
+
+import graph_connection
+from benchmarks.fake_graph import FakeGraph, patch_graph_database
+from materialize import AnswerMaterializer
+from responses import INTENTS
+
+
+@pytest.fixture
+def graph():
+    graph = FakeGraph()
+    for name, storage in (('ACARBOSE', 'Below 25C'), ('INSULIN', 'Refrigerate')):
+        graph.run("MERGE (d:Drug {name: $name}) SET d.storage = $storage", name=name, storage=storage)
+    with patch_graph_database(graph, graph_connection):
+        yield graph
+
+
+@pytest.fixture
+def materializer(graph, tmp_path):
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'neo4j': {'uri': 'bolt://fake', 'user': 'neo4j', 'password': 'secret'},
+        'answers': {'enabled': True, 'artifact_path': str(tmp_path / 'answers.db')},
+        'logging': {'level': 'INFO', 'file': str(tmp_path / 'materialize.log')},
+    }))
+    materializer = AnswerMaterializer(str(config_path))
+    yield materializer
+    materializer.close()
+
+
+def test_materialize_renders_every_intent(materializer):
+    assert materializer.materialize() == {'rendered': 2, 'unchanged': 0}
+    assert materializer.store.get('insulin', 'storage') == "Storage instructions:\nRefrigerate"
+    assert all(materializer.store.get('ACARBOSE', intent) is not None for intent in INTENTS)
+
+
+def test_materialize_skips_drugs_with_unchanged_profiles(materializer, graph):
+    materializer.materialize()
+    graph.run("MERGE (d:Drug {name: $name}) SET d.storage = $storage", name='INSULIN', storage='Do not freeze')
+    assert materializer.materialize() == {'rendered': 1, 'unchanged': 1}
+    assert materializer.store.get('INSULIN', 'storage') == "Storage instructions:\nDo not freeze"
+
+    materializer.store.invalidate('ACARBOSE')
+    assert materializer.materialize() == {'rendered': 1, 'unchanged': 1}
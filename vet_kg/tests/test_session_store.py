@@ -0,0 +1,93 @@
+import pytest
+
+import session_store
+from session_store import InMemorySessionStore, SessionState, SQLiteSessionStore
+
+
+class FakeClock:
+    """Stands in for the `time` module, so expiry does not depend on sleeping."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, 'time', clock)
+    return clock
+
+
+def test_memory_store_evicts_least_recently_used(clock):
+    store = InMemorySessionStore(max_sessions=2)
+    store.put('a', SessionState(('ACARBOSE',)))
+    store.put('b', SessionState(('INSULIN',)))
+    assert store.get('a').drugs == ('ACARBOSE',)
+    store.put('c', SessionState(('ACEMANNAN',)))
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert len(store) == 2
+
+
+def test_memory_store_expires_idle_sessions(clock):
+    store = InMemorySessionStore(ttl_seconds=60)
+    store.put('a', SessionState(('ACARBOSE',)))
+    clock.now += 30
+    store.put('b', SessionState(('INSULIN',)))
+    clock.now += 31
+    assert store.get('a') is None
+    assert store.get('b') is not None
+    clock.now += 61
+    assert len(store) == 0
+    assert store.memory_usage == 0
+
+
+def test_memory_store_caps_bytes(clock):
+    size = SessionState(('ACARBOSE',)).size
+    store = InMemorySessionStore(max_bytes=int(size * 2.5))
+    for session_id in 'abc':
+        store.put(session_id, SessionState(('ACARBOSE',)))
+    assert store.get('a') is None
+    assert store.memory_usage == 2 * size
+    store.put('huge', SessionState(('ACARBOSE',), profile={'uses': 'x' * size * 3}))
+    assert store.get('huge') is None
+    assert len(store) == 2
+
+
+def test_sqlite_store_evicts_least_recently_used_and_expired(clock, tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), max_sessions=2, ttl_seconds=60)
+    store.put('a', SessionState(('ACARBOSE',)))
+    clock.now += 1
+    store.put('b', SessionState(('INSULIN',)))
+    clock.now += 1
+    assert store.get('a').drugs == ('ACARBOSE',)
+    clock.now += 1
+    store.put('c', SessionState(('ACEMANNAN',)))
+    assert store.get('b') is None
+    assert len(store) == 2
+    clock.now += 61
+    assert store.get('a') is None
+    store.put('d', SessionState(('INSULIN',)))
+    assert len(store) == 1
+    store.close()
+
+
+def test_sqlite_store_caps_bytes_from_the_oldest_session(clock, tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), max_bytes=10 ** 6)
+    for session_id in 'abc':
+        store.put(session_id, SessionState(('ACARBOSE',)))
+        clock.now += 1
+    size = store.memory_usage // 3
+    store.max_bytes = int(size * 2.5)
+    store.put('d', SessionState(('ACARBOSE',)))
+    # The running sum over the newest sessions first drops the two oldest
+    assert store.get('a') is None and store.get('b') is None
+    assert store.get('c') is not None and store.get('d') is not None
+    assert store.memory_usage == 2 * size
+    store.close()